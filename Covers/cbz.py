@@ -1,37 +1,46 @@
 import zipfile
-import xml.etree.ElementTree as ET
-import io
 import os
+from compression import DEFAULT_POLICY
+from comicinfo import ComicInfo
+import kavita
+import undo
+import validate
+from verify import check_archive
+
+
+def read_comicinfo(path, fields=None) -> ComicInfo:
+    # Metadata-only read: never touches the page members
+    with zipfile.ZipFile(path, 'r') as zf:
+        return ComicInfo.from_zip(zf, fields)
+
 
 class CBZ:
     def __init__(self, path):
         self.path = path
         self.zip = None
         self.files = {}  # filename -> bytes
-        self.xml_root = None
+        self.infos = {}  # filename -> original ZipInfo
+        self.comicinfo = None
 
     def load(self):
+        check_archive(self.path)
         self.zip = zipfile.ZipFile(self.path, 'r')
         for item in self.zip.infolist():
             self.files[item.filename] = self.zip.read(item.filename)
+            self.infos[item.filename] = item
         self._load_comicinfo()
 
     def _load_comicinfo(self):
         try:
-            data = self.files['ComicInfo.xml']
-            self.xml_root = ET.fromstring(data)
+            self.comicinfo = ComicInfo.from_bytes(self.files['ComicInfo.xml'])
         except KeyError:
-            self.xml_root = ET.Element('ComicInfo')
+            self.comicinfo = ComicInfo()
 
     def get_tag(self, tag):
-        elem = self.xml_root.find(tag)
-        return elem.text if elem is not None else None
+        return self.comicinfo.get_text(tag)
 
     def set_tag(self, tag, value):
-        elem = self.xml_root.find(tag)
-        if elem is None:
-            elem = ET.SubElement(self.xml_root, tag)
-        elem.text = value
+        self.comicinfo.set(tag, value)
 
     def replace_file(self, name, content_bytes):
         self.files[name] = content_bytes
@@ -40,18 +49,43 @@ class CBZ:
         with open(source_path, 'rb') as f:
             self.files[name] = f.read()
 
+    def rename_file(self, old_name, new_name, content_bytes=None):
+        # Keeps the member in the same position in the archive
+        if new_name != old_name and new_name in self.files:
+            raise ValueError(f"{new_name} already exists in {self.path}")
+        content = self.files[old_name] if content_bytes is None else content_bytes
+        self.files = {new_name if name == old_name else name: content if name == old_name else data
+                      for name, data in self.files.items()}
+        self.infos.pop(old_name, None)
+
 
 
 
-    def save(self, output_path):
-        buffer = io.BytesIO()
-        ET.ElementTree(self.xml_root).write(buffer, encoding='utf-8', xml_declaration=True)
-        buffer.seek(0)
-        self.files['ComicInfo.xml'] = buffer.read()
+    def generate_pages(self):
+        # <Pages> from image headers only, see pages.py
+        from pages import pages_from_files, apply_pages
+        apply_pages(self.comicinfo, pages_from_files(self.files))
+
+    def save(self, output_path, policy=None, strict=True):
+        policy = policy or DEFAULT_POLICY
+        try:
+            validate.check(self.comicinfo, self.path)
+        except validate.ValidationError as e:
+            if strict:
+                raise
+            # Metadata this write did not touch is left as it was
+            print(f"Warning: {e}")
+        overwriting = self.zip is not None and os.path.abspath(output_path) == os.path.abspath(self.path)
+        previous = undo.snapshot(self.zip) if overwriting else None
+        self.files['ComicInfo.xml'] = self.comicinfo.to_bytes()
 
         with zipfile.ZipFile(output_path, 'w') as out_zip:
-            for name, content in self.files.items():
-                out_zip.writestr(name, content)
+            policy.write_members(out_zip, ((name, content, self.infos.get(name))
+                                           for name, content in self.files.items()))
+
+        kavita.record_change(output_path)
+        if previous is not None:
+            undo.record(output_path, previous)
 
         if self.zip:
             self.zip.close()
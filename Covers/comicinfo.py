@@ -0,0 +1,216 @@
+"""
+Compact ComicInfo.xml model shared by the scripts and the editor.
+
+Known schema fields live in __slots__ and are typed where the schema says
+so (ints stay strings if they are not written canonically, so a load/save
+round trip never changes the text). Unknown tags such as mangaId or
+coverImage go to the extra dict, and document order is kept. Elements the
+model cannot hold (a repeated tag, an unknown tag with children) are kept
+as raw subtrees and written back unchanged.
+
+Parsing can be selective: ComicInfo.from_bytes(data, fields=("Volume",))
+stops as soon as the requested tags are seen. <Pages> is never parsed up
+front; it is read from the retained XML the first time .pages is used.
+"""
+import copy
+import io
+import xml.etree.ElementTree as ET
+
+KNOWN_FIELDS = {
+    "Title": str, "Series": str, "Number": str, "Count": int, "Volume": int,
+    "AlternateSeries": str, "AlternateNumber": str, "AlternateCount": int,
+    "Summary": str, "Notes": str, "Year": int, "Month": int, "Day": int,
+    "Writer": str, "Penciller": str, "Inker": str, "Colorist": str, "Letterer": str,
+    "CoverArtist": str, "Editor": str, "Translator": str, "Publisher": str, "Imprint": str,
+    "Genre": str, "Tags": str, "Web": str, "PageCount": int, "LanguageISO": str,
+    "Format": str, "BlackAndWhite": str, "Manga": str, "Characters": str, "Teams": str,
+    "Locations": str, "ScanInformation": str, "StoryArc": str, "StoryArcNumber": str,
+    "SeriesGroup": str, "AgeRating": str, "CommunityRating": float,
+    "MainCharacterOrTeam": str, "Review": str, "GTIN": str, "LocalizedSeries": str,
+}
+
+_UNSET = object()
+
+ET.register_namespace("xsi", "http://www.w3.org/2001/XMLSchema-instance")
+ET.register_namespace("xsd", "http://www.w3.org/2001/XMLSchema")
+
+
+def parse_value(tag: str, text: str | None):
+    kind = KNOWN_FIELDS.get(tag, str)
+    if text is None or kind is str:
+        return text
+    try:
+        value = kind(text)
+    except ValueError:
+        return text
+    # Only keep the typed value if it serializes back to the same text
+    return value if format_value(value) == text else text
+
+
+def format_value(value) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+class ComicInfo:
+    __slots__ = tuple(KNOWN_FIELDS) + ("extra", "attrib", "_order", "_raw", "_complete", "_pages")
+
+    def __init__(self):
+        for name in KNOWN_FIELDS:
+            setattr(self, name, _UNSET)
+        self.extra = {}  # unknown tag -> text
+        self.attrib = {}  # root element attributes (xmlns etc.)
+        self._order = []  # tag names, or raw ET.Elements kept verbatim, in document order
+        self._raw = None
+        self._complete = True
+        self._pages = None  # list of <Page> attribute dicts, or _UNSET if not parsed yet
+
+    @classmethod
+    def from_bytes(cls, data: bytes, fields=None) -> "ComicInfo":
+        info = cls()
+        info._raw = data
+        info._complete = False
+        info._parse(fields)
+        return info
+
+    @classmethod
+    def from_zip(cls, zipf, fields=None) -> "ComicInfo":
+        try:
+            data = zipf.read("ComicInfo.xml")
+        except KeyError:
+            return cls()
+        return cls.from_bytes(data, fields)
+
+    def _parse(self, fields=None):
+        wanted = set(fields) if fields else None
+        depth = 0
+        for event, elem in ET.iterparse(io.BytesIO(self._raw), events=("start", "end")):
+            if event == "start":
+                if depth == 0:
+                    self.attrib = dict(elem.attrib)
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                if depth == 0:
+                    self._complete = True
+                continue
+            tag = elem.tag
+            if tag == "Pages":
+                self._pages = _UNSET
+                self._order.append(tag)
+            elif tag in self._order or (tag not in KNOWN_FIELDS and len(elem)):
+                raw = copy.deepcopy(elem)
+                raw.tail = None
+                self._order.append(raw)
+            else:
+                self._order.append(tag)
+                self._store(tag, parse_value(tag, elem.text))
+            elem.clear()
+            if wanted is not None:
+                wanted.discard(tag)
+                if not wanted:
+                    return
+
+    def original(self) -> "ComicInfo":
+        """The model as it was loaded, before any edits."""
+        return ComicInfo.from_bytes(self._raw) if self._raw is not None else ComicInfo()
+
+    def _ensure_complete(self):
+        if not self._complete:
+            self._order = []
+            self._parse()
+
+    def _store(self, tag, value):
+        if tag in KNOWN_FIELDS:
+            setattr(self, tag, value)
+        else:
+            self.extra[tag] = value
+
+    def has(self, tag: str) -> bool:
+        value = getattr(self, tag) if tag in KNOWN_FIELDS else self.extra.get(tag, _UNSET)
+        if value is _UNSET and not self._complete:
+            self._ensure_complete()
+            return self.has(tag)
+        return value is not _UNSET
+
+    def get(self, tag: str, default=None):
+        if tag == "Pages":
+            return self.pages
+        if not self.has(tag):
+            return default
+        return getattr(self, tag) if tag in KNOWN_FIELDS else self.extra[tag]
+
+    def get_text(self, tag: str) -> str | None:
+        return format_value(self.get(tag))
+
+    def set(self, tag: str, value) -> None:
+        self._ensure_complete()
+        if tag not in self._order:
+            # Setting a tag only held raw takes over its place
+            raw = next((i for i, e in enumerate(self._order) if not isinstance(e, str) and e.tag == tag), None)
+            if raw is None:
+                self._order.append(tag)
+            else:
+                self._order[raw] = tag
+        self._store(tag, parse_value(tag, value) if isinstance(value, str) else value)
+
+    def remove(self, tag: str) -> None:
+        self._ensure_complete()
+        self._order = [e for e in self._order if (e if isinstance(e, str) else e.tag) != tag]
+        if tag in KNOWN_FIELDS:
+            setattr(self, tag, _UNSET)
+        elif tag == "Pages":
+            self._pages = None
+        else:
+            self.extra.pop(tag, None)
+
+    def tags(self) -> list[str]:
+        self._ensure_complete()
+        return [e for e in self._order if isinstance(e, str)]
+
+    def as_dict(self) -> dict:
+        """Tag -> text for every top-level tag except <Pages>."""
+        return {tag: self.get_text(tag) or "" for tag in self.tags() if tag != "Pages"}
+
+    @property
+    def pages(self) -> list[dict] | None:
+        self._ensure_complete()
+        if self._pages is _UNSET:
+            root = ET.fromstring(self._raw)
+            self._pages = [dict(page.attrib) for page in root.find("Pages").findall("Page")]
+        return self._pages
+
+    @pages.setter
+    def pages(self, pages: list[dict] | None) -> None:
+        self._ensure_complete()
+        if pages is None:
+            self.remove("Pages")
+            return
+        if "Pages" not in self._order:
+            self._order.append("Pages")
+        self._pages = pages
+
+    def to_element(self) -> ET.Element:
+        root = ET.Element("ComicInfo", self.attrib)
+        self._ensure_complete()
+        for tag in self._order:
+            if not isinstance(tag, str):
+                root.append(copy.deepcopy(tag))
+            elif tag == "Pages":
+                pages = ET.SubElement(root, "Pages")
+                for page in self.pages:
+                    ET.SubElement(pages, "Page", {k: str(v) for k, v in page.items()})
+            else:
+                ET.SubElement(root, tag).text = self.get_text(tag)
+        return root
+
+    def to_bytes(self) -> bytes:
+        root = self.to_element()
+        ET.indent(root)
+        buffer = io.BytesIO()
+        ET.ElementTree(root).write(buffer, encoding="utf-8", xml_declaration=True)
+        return buffer.getvalue()
@@ -0,0 +1,223 @@
+"""
+Compression policy shared by every archive writer.
+
+Already-compressed images (JPEG/PNG/WebP/...) are stored, which is what
+Kavita extracts fastest, and text/XML is deflated. Images that an older tool
+deflated keep that method unless recompress_images is set, in which case
+they are rewritten as stored.
+
+write_members() writes through the public writestr() unless the archive is
+a real repack: at least PARALLEL_MIN_BYTES to deflate (legacy deflated pages,
+a policy change). Those members are compressed concurrently (zlib releases
+the GIL) and appended to the zip in the original order with their CRCs and
+offsets. Every archive written in a process shares one thread pool, so
+scripts that already write several archives at once don't multiply threads;
+inside a worker process members are compressed serially, since the process
+pool already fills the cores. Appending precompressed members needs ZipFile
+internals, so on Python versions newer than those checked, or if the
+internals are missing, repacks fall back to writestr() as well.
+
+With stable_layout (--stable-layout, or CBZ_STABLE_LAYOUT=1 for the editor)
+archives are written in a canonical, rsync-friendly order: pages keep their
+original position and timestamp, and the members we edit (cover, then
+ComicInfo.xml) always go last with a fixed timestamp. A metadata edit then
+only changes the tail of the file. Pages that were deflated by another tool
+are re-deflated once on the first stable rewrite and stay byte-identical
+after that.
+"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".avif", ".jxl")
+MUTABLE_MEMBERS = ("folder.jpg", "cover.jpg", "comicinfo.xml")  # tail order under stable_layout
+STABLE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024  # deflate work below this is written serially
+PRECOMPRESSED_VERSIONS = ((3, 8), (3, 13))  # write_precompressed() checked against these ZipFile internals
+ZIPFILE_INTERNALS = ("_lock", "_writecheck", "_didModify", "start_dir", "fp", "filelist", "NameToInfo")
+
+
+def mutable_rank(name: str) -> int | None:
+    try:
+        return MUTABLE_MEMBERS.index(os.path.basename(name).lower())
+    except ValueError:
+        return None
+
+
+class CompressionStats:
+    def __init__(self):
+        self.members = 0
+        self.raw_bytes = 0
+        self.before_bytes = 0  # compressed size of members we had a previous entry for
+        self.after_bytes = 0  # compressed size of those same members now
+        self.written_bytes = 0
+        self.cpu_seconds = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, info: zipfile.ZipInfo, current: zipfile.ZipInfo | None, cpu_seconds: float) -> None:
+        with self.lock:
+            self._add(info, current, cpu_seconds)
+
+    def _add(self, info: zipfile.ZipInfo, current: zipfile.ZipInfo | None, cpu_seconds: float) -> None:
+        self.members += 1
+        self.raw_bytes += info.file_size
+        self.written_bytes += info.compress_size
+        self.cpu_seconds += cpu_seconds
+        if current is not None:
+            self.before_bytes += current.compress_size
+            self.after_bytes += info.compress_size
+
+    def snapshot(self) -> tuple:
+        with self.lock:
+            return (self.members, self.raw_bytes, self.before_bytes, self.after_bytes, self.written_bytes,
+                    self.cpu_seconds)
+
+    def report(self, since: tuple | None = None) -> str:
+        """Totals so far, or only what was written after the snapshot `since`."""
+        current = self.snapshot()
+        if since is not None:
+            current = tuple(now - then for now, then in zip(current, since))
+        members, raw_bytes, before_bytes, after_bytes, written_bytes, cpu_seconds = current
+        return (f"Compression: {members} members, {raw_bytes} raw bytes -> {written_bytes} written "
+                f"({raw_bytes - written_bytes} saved by compression, "
+                f"{before_bytes - after_bytes} saved vs. previous archives), "
+                f"{cpu_seconds:.2f}s CPU")
+
+
+class CompressionPolicy:
+    def __init__(self, level: int = 6, recompress_images: bool = False, workers: int | None = None,
+                 stable_layout: bool = False):
+        self.level = level
+        self.recompress_images = recompress_images
+        self.workers = workers  # None means one per core
+        self.stable_layout = stable_layout
+        self.stats = CompressionStats()
+        self.pool = None  # shared by every archive this policy writes
+        self.pool_lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self.pool_lock:
+            if self.pool is None:
+                self.pool = ThreadPoolExecutor(max_workers=self.workers or os.cpu_count() or 1)
+            return self.pool
+
+    def compression_for(self, name: str, current: zipfile.ZipInfo | None = None) -> tuple[int, int | None]:
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            if current is not None and current.compress_type == zipfile.ZIP_DEFLATED and not self.recompress_images:
+                return zipfile.ZIP_DEFLATED, self.level
+            return zipfile.ZIP_STORED, None
+        return zipfile.ZIP_DEFLATED, self.level
+
+    def member_info(self, name: str, current: zipfile.ZipInfo | None = None) -> zipfile.ZipInfo:
+        if self.stable_layout and (current is None or mutable_rank(name) is not None):
+            info = zipfile.ZipInfo(name, date_time=STABLE_DATE_TIME)
+            info.external_attr = 0o644 << 16
+        elif current is not None:
+            info = zipfile.ZipInfo(name, date_time=current.date_time)
+            info.external_attr = current.external_attr
+            info.comment = current.comment
+        else:
+            info = zipfile.ZipInfo(name, date_time=time.localtime(time.time())[:6])
+            info.external_attr = 0o600 << 16
+        return info
+
+    def layout(self, members: list) -> list:
+        """Member order to write; unchanged unless stable_layout is set."""
+        if not self.stable_layout:
+            return members
+        fixed = [m for m in members if mutable_rank(m[0]) is None]
+        tail = sorted((m for m in members if mutable_rank(m[0]) is not None), key=lambda m: mutable_rank(m[0]))
+        return fixed + tail
+
+    def write(self, zout: zipfile.ZipFile, name: str, data: bytes, current: zipfile.ZipInfo | None = None) -> None:
+        """Write one member using the policy; current is the member's previous ZipInfo, if any."""
+        info = self.member_info(name, current)
+        compress_type, compress_level = self.compression_for(name, current)
+        started = time.process_time()
+        zout.writestr(info, data, compress_type=compress_type, compresslevel=compress_level)
+        self.stats.add(info, current, time.process_time() - started)
+
+    def compress_member(self, name: str, data: bytes, current: zipfile.ZipInfo | None = None):
+        info = self.member_info(name, current)
+        compress_type, compress_level = self.compression_for(name, current)
+        started = time.thread_time()
+        info.compress_type = compress_type
+        info.file_size = len(data)
+        info.CRC = zlib.crc32(data)
+        if compress_type == zipfile.ZIP_DEFLATED:
+            # Raw deflate stream, as stored in zip members
+            compressor = zlib.compressobj(compress_level, zlib.DEFLATED, -15)
+            payload = compressor.compress(data) + compressor.flush()
+        else:
+            payload = data
+        info.compress_size = len(payload)
+        return info, payload, time.thread_time() - started
+
+    def deflate_bytes(self, members) -> int:
+        return sum(len(data) for name, data, current in members
+                   if self.compression_for(name, current)[0] == zipfile.ZIP_DEFLATED)
+
+    def write_members(self, zout: zipfile.ZipFile, members, workers: int | None = None) -> None:
+        """
+        Write (name, data, current) members, compressing them in parallel.
+        Members land in the archive in the order given (see layout());
+        workers=1 writes them serially.
+        """
+        members = self.layout(list(members))
+        if workers is None and multiprocessing.parent_process() is not None:
+            workers = 1
+        if (workers == 1 or self.workers == 1 or self.deflate_bytes(members) < PARALLEL_MIN_BYTES
+                or not can_write_precompressed(zout)):
+            for name, data, current in members:
+                self.write(zout, name, data, current)
+            return
+
+        results = self._pool().map(lambda m: self.compress_member(*m), members)
+        for (_, _, current), (info, payload, cpu_seconds) in zip(members, results):
+            write_precompressed(zout, info, payload)
+            self.stats.add(info, current, cpu_seconds)
+
+
+def can_write_precompressed(zout: zipfile.ZipFile) -> bool:
+    low, high = PRECOMPRESSED_VERSIONS
+    return low <= sys.version_info[:2] <= high and all(hasattr(zout, name) for name in ZIPFILE_INTERNALS)
+
+
+def write_precompressed(zout: zipfile.ZipFile, info: zipfile.ZipInfo, payload: bytes) -> None:
+    """Append a member whose CRC, sizes and compressed payload are already computed."""
+    with zout._lock:
+        zout._writecheck(info)
+        zout._didModify = True
+        info.header_offset = zout.fp.tell()
+        zip64 = info.file_size > zipfile.ZIP64_LIMIT or info.compress_size > zipfile.ZIP64_LIMIT
+        zout.fp.write(info.FileHeader(zip64))
+        zout.fp.write(payload)
+        zout.filelist.append(info)
+        zout.NameToInfo[info.filename] = info
+        zout.start_dir = zout.fp.tell()
+
+
+DEFAULT_POLICY = CompressionPolicy(stable_layout=os.environ.get("CBZ_STABLE_LAYOUT") == "1")
+
+
+def add_policy_arguments(parser) -> None:
+    parser.add_argument("--compress-level", type=int, default=6, help="deflate level for text/XML members (1-9)")
+    parser.add_argument("--recompress-images", action="store_true",
+                        help="rewrite images that were stored deflated as stored")
+    parser.add_argument("--compress-workers", type=int, default=None,
+                        help="threads used to compress archive members (default: one per core)")
+    parser.add_argument("--stable-layout", action="store_true",
+                        help="rsync-friendly layout: pages untouched, cover and ComicInfo.xml last, fixed timestamps")
+
+
+def configure_from_args(args) -> CompressionPolicy:
+    DEFAULT_POLICY.level = args.compress_level
+    DEFAULT_POLICY.recompress_images = args.recompress_images
+    DEFAULT_POLICY.workers = args.compress_workers
+    DEFAULT_POLICY.stable_layout = args.stable_layout or DEFAULT_POLICY.stable_layout
+    return DEFAULT_POLICY
@@ -0,0 +1,42 @@
+"""
+Content and perceptual hashes for cover images.
+
+sha256 catches byte-identical covers; a 64-bit difference hash (dHash)
+catches the same cover after a re-encode or resize.
+"""
+import hashlib
+from io import BytesIO
+
+from PIL import Image
+
+DHASH_MAX_DISTANCE = 6
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def perceptual_hash(data: bytes) -> str:
+    image = Image.open(BytesIO(data))
+    image.draft("L", (64, 64))  # cheap JPEG downscale while decoding
+    pixels = list(image.convert("L").resize((9, 8), Image.Resampling.LANCZOS).getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return f"{bits:016x}"
+
+
+def cover_hashes(data: bytes) -> dict:
+    return {"sha256": content_hash(data), "dhash": perceptual_hash(data)}
+
+
+def covers_match(a: dict | None, b: dict | None) -> bool:
+    if not a or not b:
+        return False
+    if a.get("sha256") and a.get("sha256") == b.get("sha256"):
+        return True
+    if a.get("dhash") and b.get("dhash"):
+        distance = bin(int(a["dhash"], 16) ^ int(b["dhash"], 16)).count("1")
+        return distance <= DHASH_MAX_DISTANCE
+    return False
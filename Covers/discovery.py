@@ -0,0 +1,120 @@
+"""
+Library discovery across one or more roots.
+
+Walks each root recursively with os.scandir and yields one SeriesUnit per
+folder that directly contains archives. Names matching an ignore pattern
+(by default anything starting with "_" or ".") are skipped, and patterns
+from a .kavitaignore file in a root are added to the defaults. File and
+folder types come from the scandir entries, so the walk needs no stat calls.
+Archives sitting directly in a root are reported and skipped, since there is
+no series folder to name them after. With named_only, so are archives in a
+folder named only for a volume or chapter ("Volume 01", "Ch. 3"), e.g.
+Series/Volume 01/ch001.cbz: the scripts that look a series up by its folder
+name would otherwise search for "Volume 01".
+
+run_parallel() hands units to a thread pool as they are found, so work on
+the first series starts before the walk has finished.
+"""
+import fnmatch
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+ARCHIVE_EXTENSIONS = (".cbz", ".zip")
+DEFAULT_IGNORE = ["_*", ".*"]
+NUMBER_ONLY_FOLDER = re.compile(r"^(?:vol(?:ume)?|v|ch(?:apter)?|c|book|part)[ ._#-]*\d+(?:\.\d+)?$",
+                                re.IGNORECASE)
+
+
+class SeriesUnit:
+    __slots__ = ("folder", "files")
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.files = []  # archive file names, sorted
+
+
+def load_ignore_file(root: str) -> list[str]:
+    try:
+        with open(os.path.join(root, ".kavitaignore"), "r", encoding="utf-8") as f:
+            return [line.strip().rstrip("/") for line in f if line.strip() and not line.startswith("#")]
+    except FileNotFoundError:
+        return []
+
+
+def is_ignored(name: str, patterns) -> bool:
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def is_number_only_folder(name: str) -> bool:
+    return bool(NUMBER_ONLY_FOLDER.match(name.strip()))
+
+
+def walk_series(root: str, patterns, extensions=ARCHIVE_EXTENSIONS, named_only=False):
+    stack = [root]
+    while stack:
+        folder = stack.pop()
+        unit = SeriesUnit(folder)
+        subfolders = []
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if is_ignored(entry.name, patterns):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        subfolders.append(entry.path)
+                    elif entry.name.lower().endswith(extensions) and entry.is_file():
+                        unit.files.append(entry.name)
+        except OSError as e:
+            print(f"Cannot read {folder}: {e}")
+            continue
+        if unit.files and folder == root:
+            # The series would be named after the root itself, so never guess one
+            print(f"Skipping {len(unit.files)} archive(s) directly in {root}; move them into a series folder")
+        elif unit.files and named_only and is_number_only_folder(os.path.basename(folder)):
+            print(f"Skipping {len(unit.files)} archive(s) in {folder}; "
+                  f"the folder is named for a volume or chapter, not a series")
+        elif unit.files:
+            unit.files.sort()
+            yield unit
+        stack.extend(sorted(subfolders, reverse=True))
+
+
+def discover(roots, ignore=None, extensions=ARCHIVE_EXTENSIONS, named_only=False):
+    for root in roots:
+        patterns = DEFAULT_IGNORE + list(ignore or []) + load_ignore_file(root)
+        yield from walk_series(root, patterns, extensions, named_only)
+
+
+def run_parallel(units, process, workers: int = 4) -> None:
+    """Call process(unit) for each unit with at most `workers` running at once."""
+    if workers <= 1:
+        for unit in units:
+            process(unit)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running = set()
+        for unit in units:
+            if len(running) >= workers * 2:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report_failure(future)
+            running.add(pool.submit(process, unit))
+        done, _ = wait(running)
+        for future in done:
+            report_failure(future)
+
+
+def report_failure(future) -> None:
+    error = future.exception()
+    if error is not None:
+        print(f"Series failed: {error}")
+
+
+def add_discovery_arguments(parser) -> None:
+    parser.add_argument("--root", action="append", dest="roots",
+                        help="library root to scan (repeatable, default: current directory)")
+    parser.add_argument("--ignore", action="append", default=[],
+                        help="extra glob pattern for folder/file names to skip (repeatable)")
+    parser.add_argument("--workers", type=int, default=4, help="series processed concurrently")
@@ -1,12 +1,26 @@
+import argparse
+import os
 from pathlib import Path
 import zipfile
-import xml.etree.ElementTree as ET
 from PIL import Image
 import requests
 from io import BytesIO
-from cbz import CBZ
+from cbz import CBZ, read_comicinfo
+from comicinfo import ComicInfo
+from mangadex import API_URL, UPLOADS_URL, MAX_IDS, list_covers
+from sidecar import resolve_manga_id, read_sidecar, update_sidecar
+from cover_hash import cover_hashes, covers_match
+from journal import Journal
+from discovery import discover, run_parallel, add_discovery_arguments
+from verify import check_archive
+from plan import plan_entry, write_plan
+import kavita
+import undo
+from compression import add_policy_arguments, configure_from_args
 import time
 
+JOURNAL_NAME = ".fetch_covers.journal"
+
 def list_subfolders():
     return [f.name for f in Path().iterdir() if f.is_dir()]
 
@@ -17,7 +31,7 @@ def list_cbz_files(subdir: str):
     return []
 
 def get_manga_from_name(manga_title: str) -> dict:
-    x = requests.get(f'https://api.mangadex.org/manga?limit=20&title={manga_title}')
+    x = requests.get(f'{API_URL}/manga?limit=20&title={manga_title}')
     data: list[dict] = x.json()["data"]
     for manga in data:
         attributes = manga["attributes"]
@@ -31,80 +45,203 @@ def get_manga_from_name(manga_title: str) -> dict:
 
     return data[0]
 
-def get_all_covers(manga_id: str, desired_languages=["en", "ja"]):
-    image_ids = {}
-    for language in desired_languages:
-        offset = 0
-        while True:
-
-            x = requests.get(f"https://api.mangadex.org/cover?manga[]={manga_id}&locales[]={language}&offset={offset}&limit=100")
-            data: list[dict] = x.json()["data"]
-            if len(data) == 0:
-                break
-
-            for image in data:
-                attributes = image["attributes"]
-                volume = attributes["volume"]
-                filename = attributes["fileName"]
-                image_ids[volume] = filename
-            if len(data) < 100:
-                break  # last page
-            offset += 100
+DESIRED_LANGUAGES = ["en", "ja"]
+volume_covers_cache = {}  # manga_id -> {volume: fileName}, filled by prefetch_covers
 
+def covers_by_volume(covers: list[dict], desired_languages) -> dict:
+    # Later languages win, as they did when each language was listed in turn
+    rank = {language: i for i, language in enumerate(desired_languages)}
+    image_ids = {}
+    ranks = {}
+    for image in covers:
+        attributes = image["attributes"]
+        volume = attributes["volume"]
+        language_rank = rank.get(attributes.get("locale"), -1)
+        if language_rank >= ranks.get(volume, -1):
+            ranks[volume] = language_rank
+            image_ids[volume] = attributes["fileName"]
     return image_ids
 
+def prefetch_covers(manga_ids, desired_languages=DESIRED_LANGUAGES) -> None:
+    """List covers for many series at once, every language in the same requests."""
+    for manga_id, covers in list_covers(manga_ids, desired_languages).items():
+        volume_covers_cache[manga_id] = covers_by_volume(covers, desired_languages)
+
+def with_prefetched_covers(units, batch_size=MAX_IDS):
+    """Pass discovered units through, listing covers for each batch of pinned series first."""
+    batch = []
+    for unit in units:
+        batch.append(unit)
+        if len(batch) >= batch_size:
+            yield from prefetch_batch(batch)
+            batch = []
+    yield from prefetch_batch(batch)
+
+def prefetch_batch(units):
+    pinned = [sidecar["mangaId"] for unit in units if (sidecar := read_sidecar(unit.folder))]
+    pinned = [manga_id for manga_id in pinned if manga_id not in volume_covers_cache]
+    if pinned:
+        try:
+            prefetch_covers(pinned)
+        except Exception as e:
+            print(f"Batched cover listing failed, listing series one at a time: {e}")
+    return units
+
+def get_all_covers(manga_id: str, desired_languages=DESIRED_LANGUAGES):
+    if manga_id not in volume_covers_cache:
+        prefetch_covers([manga_id], desired_languages)
+    return volume_covers_cache[manga_id]
+
 def get_volume_from_file(filename: str) -> str:
-    cbz = CBZ(filename)
-    cbz.load()
-    volume = cbz.get_tag("Volume")
-    return volume
+    return read_comicinfo(filename, fields=("Volume",)).get_text("Volume")
 
-def add_cover_to_cbz(cover: Image, filepath:str, locale:str) -> None:
+def add_cover_to_cbz(cover: Image, filepath:str, locale:str = None) -> None:
     cbz = CBZ(filepath)
     cbz.load()
     cbz.replace_file("folder.jpg", cover)
     cbz.set_tag("coverImage", "True")
-    cbz.set_tag("Locale", "True")
+    if locale:
+        cbz.set_tag("Locale", locale)
 
-    cbz.save(filepath)
+    cbz.save(filepath, strict=False)  # an already invalid ComicInfo.xml is reported, not a reason to skip the cover
 
 def get_image_with_url(manga_id, filepath) -> str:
-    response = requests.get(f"https://uploads.mangadex.org/covers/{manga_id}/{filepath}")
+    response = requests.get(f"{UPLOADS_URL}/covers/{manga_id}/{filepath}")
     img = Image.open(BytesIO(response.content)).convert("RGB")
     buf = BytesIO()
     img.save(buf, format='JPEG')
     return buf.getvalue()
 
 
-for folder in list_subfolders():
-    if folder[0] == "_":
-        continue
-    manga_id: str = get_manga_from_name(folder)["id"]
+def process_folder(folder: str, filenames=None, journal: Journal = None, planned: list = None) -> None:
+    if filenames is None:
+        filenames = list_cbz_files(folder)
+    if journal is None:
+        journal = Journal(None)
+    manga_id: str = resolve_manga_id(folder, get_manga_from_name)
+    if manga_id is None:
+        print(f"No MangaDex match for {folder}")
+        return
     needed_volumes = set()
-
-    for filename in list_cbz_files(folder):
-        cbz = CBZ(f"./{folder}/{filename}")
-        cbz.load()
-        if cbz.get_tag("coverImage") is None:
-            volume = get_volume_from_file(f"./{folder}/{filename}")
-            print(folder, filename, volume)
-
-            needed_volumes.add(volume)
+    needs_cover = []
+
+    for filename in filenames:
+        key = f"{folder}/{filename}"
+        if journal.done(key, "written"):
+            continue
+        resolved = journal.get(key, "resolved")
+        if resolved is None:
+            try:
+                check_archive(os.path.join(folder, filename))
+                with zipfile.ZipFile(os.path.join(folder, filename)) as zf:
+                    comicinfo = ComicInfo.from_zip(zf, fields=("coverImage", "Volume"))
+                    if comicinfo.has("coverImage"):
+                        journal.record(key, "written", skipped=True)
+                        continue
+                    embedded = zf.read("folder.jpg") if "folder.jpg" in zf.NameToInfo else None
+                resolved = journal.record(key, "resolved", volume=comicinfo.get_text("Volume"),
+                                          cover=cover_hashes(embedded) if embedded else None)
+            except Exception as e:
+                journal.fail(key, e)
+                continue
+        volume = resolved["volume"]
+        print(folder, filename, volume)
+
+        needed_volumes.add(volume)
+        needs_cover.append((filename, volume, resolved.get("cover")))
     print(needed_volumes)
+    if not needed_volumes:
+        return
 
+    # Covers are tracked by hash next to their MangaDex fileName
+    known_hashes = (read_sidecar(folder) or {}).get("covers", {})
     volume_covers = get_all_covers(manga_id)
     filtered_volume_covers = {k: v for k, v in volume_covers.items() if k in needed_volumes}
-    for volume_num, cover_path in filtered_volume_covers.items():
-        filtered_volume_covers[volume_num] = get_image_with_url(manga_id, cover_path)
+
+    # Skip downloading volumes whose every chapter already embeds the known cover
+    to_download = set()
+    for filename, volume, embedded in needs_cover:
+        cover_path = filtered_volume_covers.get(volume)
+        if cover_path and not covers_match(embedded, known_hashes.get(cover_path)):
+            to_download.add(volume)
+
+    if planned is not None:
+        # --plan: covers are downloaded by the apply phase
+        for filename, volume, embedded in needs_cover:
+            key = f"{folder}/{filename}"
+            cover_path = filtered_volume_covers.get(volume)
+            if cover_path is None:
+                journal.fail(key, f"No MangaDex cover for volume {volume}")
+                continue
+            if covers_match(embedded, known_hashes.get(cover_path)):
+                continue
+            try:
+                entry = plan_entry(os.path.join(folder, filename), {"coverImage": "True"},
+                                   cover={"name": "folder.jpg", "mangaId": manga_id, "fileName": cover_path})
+            except Exception as e:
+                journal.fail(key, e)
+                continue
+            planned.append(entry)
+        return
+
+    downloaded = {}
+    failed_downloads = {}
+    for volume_num in to_download:
+        cover_path = filtered_volume_covers[volume_num]
+        try:
+            downloaded[volume_num] = get_image_with_url(manga_id, cover_path)
+        except Exception as e:
+            failed_downloads[volume_num] = f"Cover download failed for volume {volume_num}: {e}"
+            continue
+        known_hashes[cover_path] = cover_hashes(downloaded[volume_num])
         print(f"got image {cover_path}")
         time.sleep(1)
-
-    for filename in list_cbz_files(folder):
-        volume = get_volume_from_file(f"./{folder}/{filename}")
-        cbz = CBZ(f"./{folder}/{filename}")
-        cbz.load()
-        if cbz.get_tag("coverImage") is None:
+    if downloaded:
+        update_sidecar(folder, covers=known_hashes)
+
+    for filename, volume, embedded in needs_cover:
+        key = f"{folder}/{filename}"
+        if volume not in filtered_volume_covers:
+            journal.fail(key, f"No MangaDex cover for volume {volume}")
+            continue
+        if covers_match(embedded, known_hashes.get(filtered_volume_covers[volume])):
+            print(f"cover already matches {filename}")
+            journal.record(key, "written", skipped=True)
+            continue
+        if volume in failed_downloads:
+            journal.fail(key, failed_downloads[volume])
+            continue
+        try:
             print(f"loaded {filename}")
-            add_cover_to_cbz(cover=filtered_volume_covers[volume], filepath=f"./{folder}/{filename}")
-
-
+            add_cover_to_cbz(cover=downloaded[volume], filepath=os.path.join(folder, filename))
+        except Exception as e:
+            journal.fail(key, e)
+            continue
+        journal.record(key, "written")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embed MangaDex volume covers into chapters without one.")
+    parser.add_argument("--resume", action="store_true", help="skip files finished by the previous run")
+    parser.add_argument("--plan", metavar="FILE", help="write a plan file instead of changing any archive")
+    add_policy_arguments(parser)
+    add_discovery_arguments(parser)
+    args = parser.parse_args()
+
+    policy = configure_from_args(args)
+    undo.set_library_roots(args.roots or ["."])
+    journal = Journal(None if args.plan else JOURNAL_NAME, resume=args.resume)
+    planned = [] if args.plan else None
+    # One listing per batch of pinned series; the rest are listed as they resolve
+    units = with_prefetched_covers(discover(args.roots or ["."], ignore=args.ignore, named_only=True))
+    run_parallel(units, lambda unit: process_folder(unit.folder, unit.files, journal=journal, planned=planned),
+                 args.workers)
+    if args.plan:
+        write_plan(args.plan, planned, "fetch_covers")
+        return
+    print(policy.stats.report())
+    kavita.scan_changed()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,32 @@
 """
 Run this from the /Manga directory
 This will check all subfolders for chapters.
+Pass --resume to continue an interrupted run.
 
 """
+import argparse
+import os
 import requests
 import re
 import math
 from pathlib import Path
 import zipfile
-import xml.etree.ElementTree as ET
-import io
+from mangadex import API_URL
+from sidecar import resolve_manga_id
+from journal import Journal
+from discovery import discover, run_parallel, add_discovery_arguments
+from verify import check_archive
+from plan import plan_entry, write_plan
+from comicinfo import ComicInfo
+import kavita
+import undo
+import validate
+from compression import DEFAULT_POLICY, add_policy_arguments, configure_from_args
+
+JOURNAL_NAME = ".fetch_metadata.journal"
 
 def get_manga_from_name(manga_title: str) -> dict:
-    x = requests.get(f'https://api.mangadex.org/manga?limit=20&title={manga_title}')
+    x = requests.get(f'{API_URL}/manga?limit=20&title={manga_title}')
     data: list[dict] = x.json()["data"]
     for manga in data:
         attributes = manga["attributes"]
@@ -27,7 +41,7 @@ def get_manga_from_name(manga_title: str) -> dict:
         return data[0]
 
 def get_chapter_from_manga(manga_id: str, chapter_number: int, desired_language=["en", "jp"]) -> dict:
-    x = requests.get(f"https://api.mangadex.org/chapter?manga={manga_id}&chapter={chapter_number}")
+    x = requests.get(f"{API_URL}/chapter?manga={manga_id}&chapter={chapter_number}")
     data: list[dict] = x.json()["data"]
 
     for lang in desired_language:
@@ -56,57 +70,114 @@ def list_cbz_files(subdir: str):
 def open_cbz(filename):
     return zipfile.ZipFile(filename, 'r')
 
-def read_comicinfo(zipf):
-    try:
-        data = zipf.read('ComicInfo.xml')
-        root = ET.fromstring(data)
-        return root
-    except KeyError:
-        return ET.Element('ComicInfo')  # Create blank root if not present
+def read_comicinfo(zipf) -> ComicInfo:
+    return ComicInfo.from_zip(zipf)  # blank model if not present
 
-def edit_tag(xml_root, tag, value):
-    elem = xml_root.find(tag)
-    if elem is None:
-        elem = ET.SubElement(xml_root, tag)
-    elem.text = value
-
-def save_cbz(zipf, xml_root, output_filename):
-    buffer = io.BytesIO()
-    ET.ElementTree(xml_root).write(buffer, encoding='utf-8', xml_declaration=True)
-    buffer.seek(0)
+def edit_tag(comicinfo: ComicInfo, tag, value):
+    comicinfo.set(tag, value)
 
+def save_cbz(zipf, comicinfo: ComicInfo, output_filename):
+    validate.check(comicinfo, output_filename)
     # Read all other files into memory first
     files = {
-        item.filename: zipf.read(item.filename)
+        item.filename: (item, zipf.read(item.filename))
         for item in zipf.infolist()
         if item.filename != 'ComicInfo.xml'
     }
+    try:
+        current_xml = zipf.getinfo('ComicInfo.xml')
+    except KeyError:
+        current_xml = None
+    previous = undo.snapshot(zipf)
 
     with zipfile.ZipFile(output_filename, 'w') as new_zip:
-        for name, data in files.items():
-            new_zip.writestr(name, data)
-        new_zip.writestr('ComicInfo.xml', buffer.read())
-
-for folder in list_subfolders():
-    if folder[0] == "_":
-        continue
-    manga_id: str = get_manga_from_name(folder)["id"]
+        members = [(name, data, item) for name, (item, data) in files.items()]
+        members.append(('ComicInfo.xml', comicinfo.to_bytes(), current_xml))
+        DEFAULT_POLICY.write_members(new_zip, members)
+    kavita.record_change(output_filename)
+    undo.record(output_filename, previous)
+
+def process_folder(folder: str, filenames=None, journal: Journal = None, planned: list = None) -> None:
+    if filenames is None:
+        filenames = list_cbz_files(folder)
+    if journal is None:
+        journal = Journal(None)
+    manga_id: str = resolve_manga_id(folder, get_manga_from_name)
+    if manga_id is None:
+        print(f"No MangaDex match for {folder}")
+        return
     chapter_ids = {}
-    for filename in list_cbz_files(folder):
-        chapter_number = get_chapter_number_from_filename(filename)
-        chapter = get_chapter_from_manga(manga_id, math.floor(float(chapter_number)))
+    for filename in filenames:
+        key = f"{folder}/{filename}"
+        if journal.done(key, "written"):
+            continue
+        fetched = journal.get(key, "fetched")
+        if fetched is None:
+            try:
+                check_archive(os.path.join(folder, filename))
+                chapter_number = get_chapter_number_from_filename(filename)
+                journal.record(key, "resolved", mangaId=manga_id, chapter=chapter_number)
+                chapter = get_chapter_from_manga(manga_id, math.floor(float(chapter_number)))
+                fetched = journal.record(key, "fetched", chapterId=chapter["id"],
+                                         volume=chapter["attributes"]["volume"],
+                                         number=chapter["attributes"]["chapter"])
+            except Exception as e:
+                journal.fail(key, e)
+                continue
         print(filename)
 
-        chapter_ids[filename] = chapter
-
-    for filename, chapter in chapter_ids.items():
-        attributes = chapter["attributes"]
-        cbzfile = open_cbz(f"{folder}/{filename}")
-        root = read_comicinfo(cbzfile)
-        edit_tag(root, "chapterId", chapter["id"])
-        edit_tag(root, "mangaId", manga_id)
-        edit_tag(root, "Volume", attributes["volume"])
-        edit_tag(root, "Number", attributes["chapter"])
-        save_cbz(cbzfile, root, f"{folder}/{filename}")
-        cbzfile.close()
-
+        chapter_ids[filename] = fetched
+
+    for filename, fetched in chapter_ids.items():
+        key = f"{folder}/{filename}"
+        if planned is not None:
+            # --plan: record what would change, write nothing
+            try:
+                entry = plan_entry(os.path.join(folder, filename), {
+                    "chapterId": fetched["chapterId"], "mangaId": manga_id,
+                    "Volume": fetched["volume"], "Number": fetched["number"]})
+            except Exception as e:
+                journal.fail(key, e)
+                continue
+            if entry:
+                planned.append(entry)
+            continue
+        try:
+            cbzfile = open_cbz(os.path.join(folder, filename))
+            root = read_comicinfo(cbzfile)
+            edit_tag(root, "chapterId", fetched["chapterId"])
+            edit_tag(root, "mangaId", manga_id)
+            edit_tag(root, "Volume", fetched["volume"])
+            edit_tag(root, "Number", fetched["number"])
+            save_cbz(cbzfile, root, os.path.join(folder, filename))
+            cbzfile.close()
+        except Exception as e:
+            journal.fail(key, e)
+            continue
+        journal.record(key, "written")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tag every chapter with its MangaDex metadata.")
+    parser.add_argument("--resume", action="store_true", help="skip files finished by the previous run")
+    parser.add_argument("--plan", metavar="FILE", help="write a plan file instead of changing any archive")
+    add_policy_arguments(parser)
+    add_discovery_arguments(parser)
+    args = parser.parse_args()
+
+    policy = configure_from_args(args)
+    undo.set_library_roots(args.roots or ["."])
+    journal = Journal(None if args.plan else JOURNAL_NAME, resume=args.resume)
+    planned = [] if args.plan else None
+    units = discover(args.roots or ["."], ignore=args.ignore, named_only=True)
+    run_parallel(units, lambda unit: process_folder(unit.folder, unit.files, journal=journal, planned=planned),
+                 args.workers)
+    if args.plan:
+        write_plan(args.plan, planned, "fetch_metadata")
+        return
+    print(policy.stats.report())
+    kavita.scan_changed()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Append-only checkpoint journal used by fetch_metadata.py and fetch_covers.py.
+
+Each line is a JSON record of one stage finishing (or failing) for one file:
+    {"file": "Series/ch1.cbz", "stage": "fetched", "time": ..., ...}
+
+A normal run starts a fresh journal. A run with --resume replays it, skips
+files that already reached "written" and reuses whatever earlier stages
+recorded, so only unfinished and failed files are redone.
+"""
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class Journal:
+    def __init__(self, path: str | None, resume: bool = False):
+        self.path = path
+        self.entries = {}  # (file, stage) -> record
+        self.lock = threading.Lock()  # series may be processed concurrently
+        if path is None:
+            return
+        if resume:
+            self._replay()
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def _replay(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line from an interrupted write
+                    self.entries[(record["file"], record["stage"])] = record
+        except FileNotFoundError:
+            pass
+
+    def get(self, file: str, stage: str) -> dict | None:
+        return self.entries.get((file, stage))
+
+    def done(self, file: str, stage: str) -> bool:
+        return (file, stage) in self.entries
+
+    def record(self, file: str, stage: str, **data) -> dict:
+        record = {"file": file, "stage": stage, "time": datetime.now().isoformat(timespec="seconds"), **data}
+        with self.lock:
+            self.entries[(file, stage)] = record
+            if self.path is not None:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+        return record
+
+    def fail(self, file: str, error) -> None:
+        print(f"Failed {file}: {error}")
+        self.record(file, "failed", error=str(error))
@@ -0,0 +1,85 @@
+"""
+Targeted Kavita scans after our tools rewrite archives.
+
+Every write path calls record_change(archive_path). After a run,
+scan_changed() asks Kavita to rescan only the affected series folders via
+POST /api/Library/scan-folder, coalescing nested folders and rate limiting
+the calls. Configuration comes from the environment:
+
+    KAVITA_URL           e.g. http://kavita:5000 (scans are skipped when unset)
+    KAVITA_API_KEY       API key from the Kavita user settings
+    KAVITA_LOCAL_ROOT    library root as seen by these tools (optional)
+    KAVITA_REMOTE_ROOT   the same root as seen by Kavita, e.g. /manga (optional)
+
+kavita_mock.py provides a local stand-in for testing.
+"""
+import os
+import threading
+import time
+
+_changed = set()
+_lock = threading.Lock()
+
+
+def record_change(archive_path: str) -> None:
+    with _lock:
+        _changed.add(os.path.dirname(os.path.abspath(archive_path)))
+
+
+def pop_changed() -> set:
+    with _lock:
+        changed = set(_changed)
+        _changed.clear()
+    return changed
+
+
+def coalesce(folders) -> list[str]:
+    # A scan of a folder covers everything below it
+    kept = []
+    for folder in sorted(set(folders)):
+        if not any(folder == k or folder.startswith(k.rstrip(os.sep) + os.sep) for k in kept):
+            kept.append(folder)
+    return kept
+
+
+def to_kavita_path(folder: str) -> str:
+    local_root = os.environ.get("KAVITA_LOCAL_ROOT")
+    remote_root = os.environ.get("KAVITA_REMOTE_ROOT")
+    if local_root and remote_root:
+        relative = os.path.relpath(folder, os.path.abspath(local_root))
+        if not relative.startswith(".."):
+            return remote_root.rstrip("/") + "/" + relative.replace(os.sep, "/")
+    return folder
+
+
+def scan_folders(folders, base_url: str | None = None, api_key: str | None = None,
+                 min_interval: float = 1.0) -> list[str]:
+    base_url = (base_url or os.environ.get("KAVITA_URL", "")).rstrip("/")
+    api_key = api_key or os.environ.get("KAVITA_API_KEY", "")
+    if not base_url:
+        return []
+    import requests
+
+    scanned = []
+    for i, folder in enumerate(coalesce(folders)):
+        if i:
+            time.sleep(min_interval)
+        path = to_kavita_path(folder)
+        try:
+            res = requests.post(f"{base_url}/api/Library/scan-folder",
+                                json={"apiKey": api_key, "folderPath": path}, timeout=30)
+            res.raise_for_status()
+            scanned.append(path)
+        except Exception as e:
+            print(f"Kavita scan failed for {path}: {e}")
+    return scanned
+
+
+def scan_changed(**kwargs) -> list[str]:
+    changed = pop_changed()
+    if not changed:
+        return []
+    scanned = scan_folders(changed, **kwargs)
+    if scanned:
+        print(f"Requested Kavita scan of {len(scanned)} folder(s)")
+    return scanned
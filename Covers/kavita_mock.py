@@ -0,0 +1,88 @@
+"""
+Local stand-in for Kavita's folder scan endpoint.
+
+    python kavita_mock.py --port 5055 --api-key test
+    KAVITA_URL=http://127.0.0.1:5055 KAVITA_API_KEY=test python fetch_covers.py
+
+POST /api/Library/scan-folder is accepted when the apiKey matches and the
+request is logged. GET /scans returns every scan received so far as JSON.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class KavitaMockHandler(BaseHTTPRequestHandler):
+    server_version = "KavitaMock/1.0"
+
+    def do_POST(self):
+        if self.path.rstrip("/").lower() != "/api/library/scan-folder":
+            self.send_json(404, {"message": "Not found"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self.send_json(400, {"message": "Invalid JSON"})
+            return
+        if body.get("apiKey") != self.server.api_key:
+            self.send_json(401, {"message": "Invalid API key"})
+            return
+        if not body.get("folderPath"):
+            self.send_json(400, {"message": "folderPath is required"})
+            return
+        with self.server.lock:
+            self.server.scans.append({"folderPath": body["folderPath"], "time": time.time()})
+        print(f"scan requested: {body['folderPath']}")
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/scans":
+            with self.server.lock:
+                self.send_json(200, self.server.scans)
+            return
+        self.send_json(404, {"message": "Not found"})
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host: str, port: int, api_key: str) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), KavitaMockHandler)
+    server.api_key = api_key
+    server.scans = []
+    server.lock = threading.Lock()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Kavita scan-folder endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--api-key", default="test")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.api_key)
+    print(f"Kavita mock on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
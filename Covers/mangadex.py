@@ -0,0 +1,66 @@
+"""
+MangaDex endpoints used by the scripts and the editor.
+
+Set MANGADEX_API_URL / MANGADEX_UPLOADS_URL to point everything at another
+host, e.g. the local stand-in from mangadex_standin.py:
+
+    MANGADEX_API_URL=http://127.0.0.1:8765 MANGADEX_UPLOADS_URL=http://127.0.0.1:8765 python fetch_covers.py
+
+List endpoints are read with list_all(): array parameters (manga[], locales[])
+carry many series or locales per request, and once the first page
+reports the total the remaining pages are fetched concurrently.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+API_URL = os.environ.get("MANGADEX_API_URL", "https://api.mangadex.org").rstrip("/")
+UPLOADS_URL = os.environ.get("MANGADEX_UPLOADS_URL", "https://uploads.mangadex.org").rstrip("/")
+
+PAGE_LIMIT = 100  # largest page the list endpoints allow
+MAX_IDS = 100  # manga IDs sent per request in manga[]
+MAX_RESULTS = 10000  # offset + limit cap on list endpoints
+
+
+def chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def list_all(endpoint: str, params: dict, workers: int = 4) -> list[dict]:
+    """Every result of a paged list endpoint, in the API's order."""
+    import requests
+
+    def page(offset: int) -> dict:
+        res = requests.get(f"{API_URL}/{endpoint}", params={**params, "limit": PAGE_LIMIT, "offset": offset})
+        res.raise_for_status()
+        return res.json()
+
+    first = page(0)
+    results = first["data"]
+    total = min(first.get("total", len(results)), MAX_RESULTS)
+    offsets = range(PAGE_LIMIT, total, PAGE_LIMIT)
+    if offsets:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for body in pool.map(page, offsets):
+                results.extend(body["data"])
+    return results
+
+
+def related_id(item: dict, kind: str) -> str | None:
+    for relationship in item.get("relationships", []):
+        if relationship["type"] == kind:
+            return relationship["id"]
+    return None
+
+
+def list_covers(manga_ids, locales=None, **params) -> dict[str, list[dict]]:
+    """Cover records grouped by manga ID, MAX_IDS series per request."""
+    manga_ids = list(dict.fromkeys(manga_ids))
+    covers = {manga_id: [] for manga_id in manga_ids}
+    if locales:
+        params["locales[]"] = list(locales)
+    for batch in chunks(manga_ids, MAX_IDS):
+        for cover in list_all("cover", {**params, "manga[]": batch}):
+            covers.setdefault(related_id(cover, "manga"), []).append(cover)
+    return covers
+
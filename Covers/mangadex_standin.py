@@ -0,0 +1,183 @@
+"""
+Local record/replay stand-in for api.mangadex.org and uploads.mangadex.org.
+
+Record real responses once, then replay them offline with configurable
+latency, error rate and rate limiting:
+
+    python mangadex_standin.py --record --fixtures fixtures/
+    python mangadex_standin.py --fixtures fixtures/ --latency 120 --jitter 40 --error-rate 0.02 --rate-limit 5
+
+Point the tools at it with MANGADEX_API_URL and MANGADEX_UPLOADS_URL (see
+mangadex.py). Cover images are served from /covers/..., everything else is
+treated as an API call.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+UPSTREAM_API = "https://api.mangadex.org"
+UPSTREAM_UPLOADS = "https://uploads.mangadex.org"
+KEPT_HEADERS = ("Content-Type", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Retry-After")
+
+
+def fixture_key(path: str) -> str:
+    parts = urlsplit(path)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    canonical = f"{parts.path}?{query}"
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, path: str):
+        key = fixture_key(path)
+        return os.path.join(self.directory, key + ".json"), os.path.join(self.directory, key + ".body")
+
+    def load(self, path: str):
+        meta_path, body_path = self._paths(path)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                return meta, f.read()
+        except FileNotFoundError:
+            return None
+
+    def save(self, path: str, status: int, headers: dict, body: bytes) -> None:
+        meta_path, body_path = self._paths(path)
+        with open(body_path, "wb") as f:
+            f.write(body)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"path": path, "status": status, "headers": headers}, f, indent=2)
+
+
+class RateLimiter:
+    """Fixed one-second window, reported with MangaDex-style headers."""
+
+    def __init__(self, per_second: int):
+        self.per_second = per_second
+        self.lock = threading.Lock()
+        self.window = int(time.time())
+        self.used = 0
+
+    def take(self):
+        with self.lock:
+            now = int(time.time())
+            if now != self.window:
+                self.window, self.used = now, 0
+            self.used += 1
+            allowed = self.per_second <= 0 or self.used <= self.per_second
+            remaining = max(self.per_second - self.used, 0)
+            return allowed, {
+                "X-RateLimit-Limit": str(self.per_second),
+                "X-RateLimit-Remaining": str(remaining),
+                "X-RateLimit-Retry-After": str(self.window + 1),
+            }
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server_version = "MangaDexStandIn/1.0"
+
+    def do_GET(self):
+        config = self.server.config
+        if config.latency or config.jitter:
+            time.sleep(max(config.latency + random.uniform(-config.jitter, config.jitter), 0) / 1000)
+
+        allowed, limit_headers = self.server.limiter.take()
+        if not allowed:
+            self.send_json(429, {"result": "error", "errors": [{"status": 429, "title": "Too Many Requests"}]},
+                           {**limit_headers, "Retry-After": "1"})
+            return
+        if config.error_rate and random.random() < config.error_rate:
+            self.send_json(503, {"result": "error", "errors": [{"status": 503, "title": "Injected failure"}]},
+                           limit_headers)
+            return
+
+        fixture = self.server.store.load(self.path)
+        if fixture is None and config.record:
+            fixture = self.record()
+        if fixture is None:
+            self.send_json(404, {"result": "error", "errors": [{"status": 404, "title": "No fixture recorded",
+                                                                 "detail": self.path}]}, limit_headers)
+            return
+
+        meta, body = fixture
+        self.send_response(meta["status"])
+        for name, value in {**meta["headers"], **limit_headers}.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def record(self):
+        upstream = UPSTREAM_UPLOADS if self.path.startswith("/covers/") else UPSTREAM_API
+        request = urllib.request.Request(upstream + self.path, headers={"User-Agent": "kavita_tools-standin"})
+        try:
+            with urllib.request.urlopen(request) as response:
+                status, headers, body = response.status, response.headers, response.read()
+        except urllib.error.HTTPError as e:
+            status, headers, body = e.code, e.headers, e.read()
+        kept = {name: headers[name] for name in KEPT_HEADERS if headers.get(name)}
+        self.server.store.save(self.path, status, kept, body)
+        print(f"recorded {status} {self.path}")
+        return {"status": status, "headers": kept}, body
+
+    def send_json(self, status: int, payload: dict, headers: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.config.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(config) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((config.host, config.port), StandInHandler)
+    server.config = config
+    server.store = FixtureStore(config.fixtures)
+    server.limiter = RateLimiter(config.rate_limit)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline MangaDex stand-in that replays recorded fixtures.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default="mangadex_fixtures", help="fixture directory")
+    parser.add_argument("--record", action="store_true", help="fetch and save responses missing from the fixtures")
+    parser.add_argument("--latency", type=float, default=0, help="added latency per request in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="random +/- latency in ms")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of requests answered with 503")
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per second before 429 (0 = unlimited)")
+    parser.add_argument("--verbose", action="store_true")
+    config = parser.parse_args()
+
+    server = make_server(config)
+    print(f"MangaDex stand-in on http://{config.host}:{config.port} ({'record' if config.record else 'replay'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
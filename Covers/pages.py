@@ -0,0 +1,210 @@
+"""
+Run this from the /Manga directory
+Fills in ComicInfo <Pages> from image headers.
+
+Page dimensions come from the JPEG SOF segment, the PNG IHDR chunk or the
+WebP VP8/VP8L/VP8X header (plus GIF and BMP), so no page is ever decoded.
+Each <Page> gets Image, ImageSize, ImageWidth and ImageHeight; pages wider
+than they are tall are marked DoublePage and the cover page gets
+Type="FrontCover". Existing per-page attributes such as Bookmark are kept.
+
+    python pages.py                       # every archive missing <Pages>
+    python pages.py --overwrite --processes 8
+    python pages.py "Series/ch001.cbz"
+
+CBZ.generate_pages() does the same for an archive already in memory.
+"""
+import argparse
+import io
+import os
+import struct
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cbz import CBZ
+from comicinfo import ComicInfo
+from discovery import discover, add_discovery_arguments
+import kavita
+import undo
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp")
+# SOF0-SOF15 except DHT (C4), JPG (C8) and DAC (CC)
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+DOUBLE_PAGE_RATIO = 1.0  # width / height above which a page is a spread
+
+
+def jpeg_size(stream) -> tuple[int, int] | None:
+    # Walk segment headers after SOI, skipping segment bodies until a SOF
+    while True:
+        byte = stream.read(1)
+        while byte and byte != b"\xff":
+            byte = stream.read(1)
+        while byte == b"\xff":
+            byte = stream.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            continue  # markers without a length
+        if marker in (0xD9, 0xDA):
+            return None  # end of image / start of scan before any SOF
+        length = stream.read(2)
+        if len(length) != 2:
+            return None
+        length = struct.unpack(">H", length)[0]
+        if marker in SOF_MARKERS:
+            data = stream.read(5)
+            if len(data) != 5:
+                return None
+            _, height, width = struct.unpack(">BHH", data)
+            return width, height
+        stream.read(length - 2)
+
+
+def image_size(stream) -> tuple[int, int] | None:
+    """(width, height) from an image's header, or None if it isn't recognised."""
+    head = stream.read(2)
+    if head == b"\xff\xd8":
+        return jpeg_size(stream)
+    head += stream.read(28)
+    if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+        return struct.unpack(">II", head[16:24])
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        chunk = head[12:16]
+        if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+            width, height = struct.unpack("<HH", head[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L" and head[20] == 0x2F:
+            bits = struct.unpack("<I", head[21:25])[0]
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            return (int.from_bytes(head[24:27], "little") + 1,
+                    int.from_bytes(head[27:30], "little") + 1)
+        return None
+    if head[:4] == b"GIF8":
+        return struct.unpack("<HH", head[6:10])
+    if head[:2] == b"BM" and len(head) >= 26:
+        width, height = struct.unpack("<ii", head[18:26])
+        return width, abs(height)
+    return None
+
+
+def page_names(names) -> list[str]:
+    return sorted(n for n in names if n.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def build_pages(names, sizes: dict, open_member) -> list[dict]:
+    """<Page> dicts for the sorted image members; open_member(name) returns a stream."""
+    pages = []
+    page_list = page_names(names)
+    cover = undo.cover_name(page_list) or (page_list[0] if page_list else None)
+    for index, name in enumerate(page_list):
+        page = {"Image": str(index), "ImageSize": str(sizes[name])}
+        with open_member(name) as stream:
+            dimensions = image_size(stream)
+        if dimensions:
+            width, height = dimensions
+            page["ImageWidth"], page["ImageHeight"] = str(width), str(height)
+            if height and width / height > DOUBLE_PAGE_RATIO:
+                page["DoublePage"] = "true"  # xs:boolean
+        if name == cover:
+            page["Type"] = "FrontCover"
+        pages.append(page)
+    return pages
+
+
+def pages_from_zip(zipf: zipfile.ZipFile) -> list[dict]:
+    sizes = {info.filename: info.file_size for info in zipf.infolist()}
+    return build_pages(sizes, sizes, zipf.open)
+
+
+def pages_from_files(files: dict) -> list[dict]:
+    sizes = {name: len(data) for name, data in files.items()}
+    return build_pages(sizes, sizes, lambda name: io.BytesIO(files[name]))
+
+
+def merge_pages(existing, generated) -> list[dict]:
+    # Keep attributes we don't compute (Bookmark, Key, a user-set Type)
+    by_index = {page.get("Image"): page for page in existing or []}
+    merged = []
+    for page in generated:
+        old = dict(by_index.get(page["Image"], {}))
+        old.pop("DoublePage", None)
+        if "Type" in old:
+            page = {k: v for k, v in page.items() if k != "Type"}
+        merged.append({**old, **page})
+    return merged
+
+
+def apply_pages(comicinfo: ComicInfo, generated: list[dict]) -> None:
+    comicinfo.pages = merge_pages(comicinfo.pages, generated)
+    comicinfo.set("PageCount", len(generated))
+
+
+def needs_pages(comicinfo: ComicInfo) -> bool:
+    pages = comicinfo.pages
+    return not pages or any("ImageWidth" not in page for page in pages)
+
+
+def populate_file(path: str, overwrite: bool = False) -> dict:
+    """Add <Pages> to one archive. Runs in a worker process."""
+    report = {"file": path, "pages": 0, "written": False, "previous": None, "error": ""}
+    try:
+        with zipfile.ZipFile(path) as zipf:
+            comicinfo = ComicInfo.from_zip(zipf)
+            if not overwrite and not needs_pages(comicinfo):
+                return report
+            generated = pages_from_zip(zipf)
+        report["pages"] = len(generated)
+        if not generated:
+            return report
+
+        cbz = CBZ(path)
+        cbz.load()
+        report["previous"] = undo.snapshot(cbz.zip)
+        apply_pages(cbz.comicinfo, generated)
+        tmp_path = path + ".tmp"
+        cbz.save(tmp_path)
+        os.replace(tmp_path, path)
+        report["written"] = True
+    except Exception as e:
+        report["error"] = str(e)
+    return report
+
+
+def populate_files(paths, overwrite: bool = False, processes: int | None = None,
+                   run: str | None = None, mp_context=None) -> list[dict]:
+    reports = []
+    with ProcessPoolExecutor(max_workers=processes, mp_context=mp_context) as pool:
+        futures = [pool.submit(populate_file, path, overwrite) for path in paths]
+        for future in as_completed(futures):
+            report = future.result()
+            if report["written"]:
+                # Journals are appended from this process only
+                kavita.record_change(report["file"])
+                undo.record(report["file"], report["previous"], run)
+            elif report["error"]:
+                print(f"Failed {report['file']}: {report['error']}")
+            reports.append(report)
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate ComicInfo <Pages> from image headers.")
+    parser.add_argument("files", nargs="*", help="specific CBZ files (default: discover the library)")
+    parser.add_argument("--overwrite", action="store_true", help="regenerate even when <Pages> is complete")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: one per core)")
+    add_discovery_arguments(parser)
+    args = parser.parse_args()
+
+    undo.set_library_roots(args.roots or ["."])
+    paths = args.files or [os.path.join(unit.folder, name)
+                           for unit in discover(args.roots or ["."], ignore=args.ignore) for name in unit.files]
+    reports = populate_files(paths, args.overwrite, args.processes)
+    written = sum(r["written"] for r in reports)
+    print(f"Wrote <Pages> to {written} of {len(reports)} archives")
+    kavita.scan_changed()
+
+
+if __name__ == "__main__":
+    main()
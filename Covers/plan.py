@@ -0,0 +1,250 @@
+"""
+Run this from the /Manga directory
+Two-phase bulk edits: plan first, apply later.
+
+The plan phase only reads metadata. For every target it records the
+archive's signature (size, mtime), the ComicInfo tags that would be set or
+removed (already coerced and validated) and any cover to embed, and writes
+it all to a JSON plan file that can be reviewed or edited by hand:
+
+    python fetch_metadata.py --plan metadata.plan.json
+    python fetch_covers.py --plan covers.plan.json
+    python plan.py show metadata.plan.json
+    python plan.py apply metadata.plan.json --workers 8
+    python plan.py apply metadata.plan.json --resume
+
+The apply phase writes the planned changes with a worker pool. A file whose
+signature no longer matches the plan is skipped rather than overwritten.
+Progress goes to <plan>.journal, so an interrupted apply can be resumed.
+"""
+import argparse
+import json
+import os
+import threading
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from comicinfo import ComicInfo
+from compression import DEFAULT_POLICY, add_policy_arguments, configure_from_args
+from journal import Journal
+from sidecar import read_sidecar, update_sidecar
+from verify import check_archive
+import kavita
+import undo
+import validate
+
+PLAN_VERSION = 1
+
+
+def file_signature(path: str) -> list:
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def diff(before: dict, after: dict) -> tuple[dict, list]:
+    changed = {tag: value for tag, value in after.items() if before.get(tag) != value}
+    removed = [tag for tag in before if tag not in after]
+    return changed, removed
+
+
+def plan_entry(path: str, updates: dict, cover: dict | None = None, comicinfo: ComicInfo | None = None) -> dict | None:
+    """
+    Plan setting `updates` (tag -> value, None removes) on one archive.
+    Returns None when nothing would change; raises ValidationError on bad values.
+    """
+    signature = file_signature(path)
+    if comicinfo is None:
+        check_archive(path)
+        with zipfile.ZipFile(path, 'r') as zipf:
+            comicinfo = ComicInfo.from_zip(zipf)
+    before = comicinfo.as_dict()
+    for tag, value in updates.items():
+        if value is None:
+            comicinfo.remove(tag)
+        else:
+            comicinfo.set(tag, value)
+    validate.check(comicinfo, path)
+    changed, removed = diff(before, comicinfo.as_dict())
+    if not changed and not removed and cover is None:
+        return None
+    entry = {
+        "path": os.path.abspath(path),
+        "signature": signature,
+        "set": changed,
+        "remove": removed,
+        "before": {tag: before.get(tag) for tag in list(changed) + removed},
+    }
+    if cover is not None:
+        entry["cover"] = cover
+    return entry
+
+
+def write_plan(path: str, entries: list, source: str) -> None:
+    plan = {
+        "version": PLAN_VERSION,
+        "source": source,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "entries": sorted(entries, key=lambda e: e["path"]),
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(plan, f, indent=1, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    print(f"Planned changes to {len(entries)} file(s), written to {path}")
+
+
+def read_plan(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        plan = json.load(f)
+    if plan.get("version") != PLAN_VERSION:
+        raise ValueError(f"{path}: unsupported plan version {plan.get('version')}")
+    return plan
+
+
+def describe(entry: dict) -> list[str]:
+    lines = [entry["path"]]
+    for tag, value in entry["set"].items():
+        lines.append(f"    {tag}: {entry['before'].get(tag)!r} -> {value!r}")
+    for tag in entry["remove"]:
+        lines.append(f"    {tag}: {entry['before'].get(tag)!r} -> (removed)")
+    if "cover" in entry:
+        lines.append(f"    cover: {entry['cover']['name']} <- {entry['cover'].get('fileName', '?')}")
+    return lines
+
+
+class CoverCache:
+    """
+    Downloads each planned cover once, however many chapters share it.
+    Different covers download concurrently; a chapter that needs a cover
+    another worker is already fetching waits for that download.
+    """
+
+    def __init__(self):
+        self.covers = {}  # (mangaId, fileName) -> Future of the image bytes
+        self.lock = threading.Lock()
+
+    def get(self, cover: dict) -> bytes:
+        from fetch_covers import get_image_with_url
+
+        key = (cover["mangaId"], cover["fileName"])
+        with self.lock:
+            future = self.covers.get(key)
+            owner = future is None
+            if owner:
+                future = self.covers[key] = Future()
+        if owner:
+            try:
+                future.set_result(get_image_with_url(cover["mangaId"], cover["fileName"]))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+    def downloaded(self, cover: dict) -> bytes | None:
+        future = self.covers.get((cover["mangaId"], cover["fileName"]))
+        if future is None or not future.done() or future.exception() is not None:
+            return None
+        return future.result()
+
+
+def apply_entry(entry: dict, covers: CoverCache, policy=None) -> dict:
+    policy = policy or DEFAULT_POLICY
+    path = entry["path"]
+    result = {"path": path, "status": "failed", "error": "", "previous": None}
+    try:
+        if file_signature(path) != entry["signature"]:
+            result["status"], result["error"] = "skipped", "changed since the plan was made"
+            return result
+        cover_data = covers.get(entry["cover"]) if "cover" in entry else None
+        temp_path = path + ".tmp"
+        with zipfile.ZipFile(path, 'r') as zin:
+            comicinfo = ComicInfo.from_zip(zin)
+            for tag, value in entry["set"].items():
+                comicinfo.set(tag, value)
+            for tag in entry["remove"]:
+                comicinfo.remove(tag)
+            validate.check(comicinfo, path)
+            result["previous"] = undo.snapshot(zin)
+            cover_name = entry["cover"]["name"] if cover_data else None
+            members = [(item.filename, zin.read(item), item) for item in zin.infolist()
+                       if item.filename not in ("ComicInfo.xml", cover_name)]
+            members.append(("ComicInfo.xml", comicinfo.to_bytes(), zin.NameToInfo.get("ComicInfo.xml")))
+            if cover_data:
+                members.append((cover_name, cover_data, zin.NameToInfo.get(cover_name)))
+            with zipfile.ZipFile(temp_path, 'w') as zout:
+                policy.write_members(zout, members)
+        os.replace(temp_path, path)
+        result["status"] = "written"
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def apply_plan(plan: dict, journal: Journal, workers: int = 4, policy=None, run: str | None = None) -> list[dict]:
+    """Write every pending entry; undo records go to `run` (default: the current run)."""
+    covers = CoverCache()
+    pending = [e for e in plan["entries"] if not journal.done(e["path"], "written")]
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(apply_entry, entry, covers, policy): entry for entry in pending}
+        for future in as_completed(futures):
+            entry, result = futures[future], future.result()
+            if result["status"] == "written":
+                kavita.record_change(entry["path"])
+                undo.record(entry["path"], result["previous"], run)
+                journal.record(entry["path"], "written")
+            elif result["status"] == "skipped":
+                print(f"Skipped {entry['path']}: {result['error']}")
+            else:
+                journal.fail(entry["path"], result["error"])
+            results.append(result)
+    record_cover_hashes(plan["entries"], results, covers)
+    return results
+
+
+def record_cover_hashes(entries, results, covers: CoverCache) -> None:
+    # Same bookkeeping fetch_covers does, so the next run can skip these covers
+    if not any("cover" in entry for entry in entries):
+        return
+    from cover_hash import cover_hashes
+
+    written = {r["path"] for r in results if r["status"] == "written"}
+    by_folder = {}
+    for entry in entries:
+        cover = entry.get("cover")
+        if cover and entry["path"] in written:
+            data = covers.downloaded(cover)
+            if data is not None:
+                by_folder.setdefault(os.path.dirname(entry["path"]), {})[cover["fileName"]] = cover_hashes(data)
+    for folder, hashes in by_folder.items():
+        known = (read_sidecar(folder) or {}).get("covers", {})
+        update_sidecar(folder, covers={**known, **hashes})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Review or apply a bulk edit plan.")
+    parser.add_argument("command", choices=["show", "apply"])
+    parser.add_argument("plan", help="plan file written with --plan")
+    parser.add_argument("--workers", type=int, default=4, help="files written concurrently")
+    parser.add_argument("--resume", action="store_true", help="skip files applied by the previous run")
+    add_policy_arguments(parser)
+    args = parser.parse_args()
+
+    plan = read_plan(args.plan)
+    if args.command == "show":
+        print(f"Plan from {plan['source']} created {plan['created']}: {len(plan['entries'])} file(s)")
+        for entry in plan["entries"]:
+            print("\n".join(describe(entry)))
+        return
+
+    policy = configure_from_args(args)
+    journal = Journal(args.plan + ".journal", resume=args.resume)
+    results = apply_plan(plan, journal, args.workers, policy)
+    counts = {status: sum(r["status"] == status for r in results) for status in ("written", "skipped", "failed")}
+    print(f"Applied {args.plan}: {counts['written']} written, {counts['skipped']} skipped, {counts['failed']} failed")
+    print(policy.stats.report())
+    kavita.scan_changed()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Per-series sidecar that pins the resolved MangaDex manga ID.
+
+The sidecar lives in the series folder as .mangadex.json. Once written, the
+scripts and the editor use the pinned ID instead of searching by title.
+Delete the file (or edit mangaId by hand) to re-resolve a series.
+"""
+import json
+import os
+from datetime import datetime
+
+SIDECAR_NAME = ".mangadex.json"
+
+
+def sidecar_path(folder: str) -> str:
+    return os.path.join(folder, SIDECAR_NAME)
+
+
+def read_sidecar(folder: str) -> dict | None:
+    try:
+        with open(sidecar_path(folder), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if not data.get("mangaId"):
+        return None
+    return data
+
+
+def write_sidecar(folder: str, manga_id: str, title: str, confidence: str) -> dict:
+    data = {
+        "mangaId": manga_id,
+        "title": title,
+        "confidence": confidence,
+        "resolvedAt": datetime.now().isoformat(timespec="seconds"),
+    }
+    tmp_path = sidecar_path(folder) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, sidecar_path(folder))
+    return data
+
+
+def update_sidecar(folder: str, **fields) -> None:
+    data = read_sidecar(folder)
+    if data is None:
+        return  # only pinned series carry extra state
+    data.update(fields)
+    tmp_path = sidecar_path(folder) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, sidecar_path(folder))
+
+
+def match_confidence(manga: dict, manga_title: str) -> str:
+    # Mirrors the matching order of get_manga_from_name
+    attributes = manga["attributes"]
+    if list(attributes["title"].values())[0].lower() == manga_title.lower():
+        return "title"
+    for title in attributes["altTitles"]:
+        if list(title.values())[0].lower() == manga_title.lower():
+            return "altTitle"
+    return "fallback"
+
+
+def resolve_manga_id(folder: str, search) -> str | None:
+    """
+    Return the pinned manga ID for a series folder, calling search(title) and
+    pinning the result only when no sidecar exists yet.
+    """
+    pinned = read_sidecar(folder)
+    if pinned:
+        return pinned["mangaId"]
+
+    title = os.path.basename(os.path.normpath(folder))
+    manga = search(title)
+    if not manga:
+        return None
+    write_sidecar(folder, manga["id"], title, match_confidence(manga, title))
+    return manga["id"]
@@ -0,0 +1,207 @@
+"""
+Run this from the /Manga directory
+Re-encodes chapter page images to WebP (or optimized JPEG) across a process
+pool. A page is only replaced when the new encoding is smaller than the
+original by at least --threshold percent, and ComicInfo <Pages> sizes are
+updated to match. Only lossless sources (PNG, BMP, GIF) are re-encoded
+unless --include-lossy is given, and cover members are never touched.
+Rewrites are recorded in the undo journal.
+
+    python transcode.py --format webp --quality 80 --report sizes.csv
+    python transcode.py --dry-run --sample 200
+"""
+import argparse
+import csv
+import os
+import random
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+from cbz import CBZ
+import kavita
+import undo
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp")
+FORMAT_EXTENSIONS = {"webp": ".webp", "jpeg": ".jpg"}
+LOSSY_EXTENSIONS = (".jpg", ".jpeg", ".webp")
+COVER_STEMS = ("folder", "cover")
+
+
+def list_library_cbz_files() -> list[str]:
+    return sorted(str(f) for f in Path().glob("*/*.cbz")
+                  if f.is_file() and not f.parent.name.startswith("_"))
+
+
+def page_names(names) -> list[str]:
+    return sorted(n for n in names if n.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def encode_page(data: bytes, fmt: str, quality: int) -> bytes | None:
+    image = Image.open(BytesIO(data))
+    if getattr(image, "n_frames", 1) > 1:
+        return None  # leave animations alone
+    buf = BytesIO()
+    if fmt == "webp":
+        if image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+        image.save(buf, format="WEBP", quality=quality, method=4)
+    else:
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(buf, format="JPEG", quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def should_transcode(name: str, fmt: str, include_lossy: bool = False) -> bool:
+    stem, ext = os.path.splitext(os.path.basename(name))
+    if stem.lower() in COVER_STEMS:
+        return False
+    if ext.lower() in LOSSY_EXTENSIONS and not include_lossy:
+        return False  # a second lossy pass only loses quality
+    ext = ext.lower()
+    if fmt == "jpeg":
+        return ext not in (".jpg", ".jpeg")  # no lossy re-encode of JPEGs
+    return ext != FORMAT_EXTENSIONS[fmt]
+
+
+def update_page_sizes(cbz: CBZ, sizes: dict) -> None:
+    # <Page Image="n"> indexes the sorted page list
+    pages = cbz.comicinfo.pages
+    if not pages:
+        return
+    for page in pages:
+        index = page.get("Image")
+        if index is not None and index.isdigit() and int(index) in sizes and page.get("ImageSize") is not None:
+            page["ImageSize"] = str(sizes[int(index)])
+
+
+def transcode_file(path: str, fmt: str, quality: int, threshold: float, include_lossy: bool = False) -> dict:
+    cbz = CBZ(path)
+    cbz.load()
+    report = {"file": path, "pages": 0, "replaced": 0, "before": 0, "after": 0, "error": ""}
+    new_sizes = {}
+    errors = []
+
+    for index, name in enumerate(page_names(cbz.files)):
+        data = cbz.files[name]
+        report["pages"] += 1
+        report["before"] += len(data)
+        encoded = None
+        if should_transcode(name, fmt, include_lossy):
+            try:
+                encoded = encode_page(data, fmt, quality)
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+        if encoded is not None and len(encoded) <= len(data) * (1 - threshold / 100):
+            try:
+                cbz.rename_file(name, os.path.splitext(name)[0] + FORMAT_EXTENSIONS[fmt], encoded)
+            except ValueError as e:
+                errors.append(f"{name}: {e}")
+                report["after"] += len(data)
+                continue
+            new_sizes[index] = len(encoded)
+            report["replaced"] += 1
+            report["after"] += len(encoded)
+        else:
+            report["after"] += len(data)
+    report["error"] = "; ".join(errors)
+
+    if report["replaced"]:
+        update_page_sizes(cbz, new_sizes)
+        report["previous"] = undo.snapshot(cbz.zip)  # journaled by the parent process
+        tmp_path = path + ".tmp"
+        cbz.save(tmp_path)
+        os.replace(tmp_path, path)
+    elif cbz.zip:
+        cbz.zip.close()
+    return report
+
+
+def estimate(paths: list[str], fmt: str, quality: int, threshold: float, sample: int,
+             include_lossy: bool = False) -> None:
+    pages = []
+    total_bytes = 0
+    for path in paths:
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                    pages.append((path, info.filename))
+                    total_bytes += info.file_size
+    if not pages:
+        print("No pages found.")
+        return
+
+    sampled = random.sample(pages, min(sample, len(pages)))
+    before = after = 0
+    for path, name in sampled:
+        with zipfile.ZipFile(path) as zf:
+            data = zf.read(name)
+        before += len(data)
+        encoded = encode_page(data, fmt, quality) if should_transcode(name, fmt, include_lossy) else None
+        if encoded is not None and len(encoded) <= len(data) * (1 - threshold / 100):
+            after += len(encoded)
+        else:
+            after += len(data)
+
+    ratio = after / before if before else 1
+    print(f"Sampled {len(sampled)} of {len(pages)} pages: {before} -> {after} bytes ({ratio:.1%})")
+    print(f"Estimated library page bytes: {total_bytes} -> {int(total_bytes * ratio)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcode chapter pages to a smaller image format.")
+    parser.add_argument("--format", choices=sorted(FORMAT_EXTENSIONS), default="webp")
+    parser.add_argument("--quality", type=int, default=80)
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="minimum size reduction in percent before a page is replaced")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--report", default="transcode_report.csv", help="per-file size report")
+    parser.add_argument("--include-lossy", action="store_true",
+                        help="also re-encode JPEG/WebP pages (a second lossy pass)")
+    parser.add_argument("--dry-run", action="store_true", help="only estimate savings from a sample of pages")
+    parser.add_argument("--sample", type=int, default=100, help="pages to encode for --dry-run")
+    parser.add_argument("files", nargs="*", help="specific CBZ files (default: whole library)")
+    args = parser.parse_args()
+
+    paths = args.files or list_library_cbz_files()
+    if args.dry_run:
+        estimate(paths, args.format, args.quality, args.threshold, args.sample, args.include_lossy)
+        return
+
+    run = undo.new_run("transcode-")
+    reports = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(transcode_file, path, args.format, args.quality, args.threshold,
+                               args.include_lossy): path
+                   for path in paths}
+        for future in as_completed(futures):
+            try:
+                report = future.result()
+            except Exception as e:
+                report = {"file": futures[future], "pages": 0, "replaced": 0, "before": 0, "after": 0,
+                          "error": str(e)}
+            print(f"{report['file']}: {report['replaced']}/{report['pages']} pages, "
+                  f"{report['before']} -> {report['after']} bytes")
+            reports.append(report)
+            if report["replaced"]:
+                # Workers run in other processes; journals are appended from this one
+                kavita.record_change(report["file"])
+                undo.record(report["file"], report.pop("previous"), run)
+
+    reports.sort(key=lambda r: r["file"])
+    with open(args.report, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["file", "pages", "replaced", "before", "after", "error"])
+        writer.writeheader()
+        writer.writerows(reports)
+    before = sum(r["before"] for r in reports)
+    after = sum(r["after"] for r in reports)
+    print(f"Total: {before} -> {after} bytes, report written to {args.report}")
+    kavita.scan_changed()
+
+
+if __name__ == "__main__":
+    main()
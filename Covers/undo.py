@@ -0,0 +1,289 @@
+"""
+Run this from the /Manga directory
+Undo journal for ComicInfo edits.
+
+Every write path records the archive's previous ComicInfo.xml and a hash of
+its cover to .comicinfo_undo.jsonl.gz in the library root, keyed by archive
+path and the archive's signature (size, mtime) right after the write. Each
+record is appended as its own gzip member, so a library of edits costs
+kilobytes rather than a backup copy of every series.
+
+The library root is the --root a script was given (see set_library_roots),
+or the series folder's parent for archives outside any root, e.g. ones
+edited in the editor. undo.py reads every journal under its --root folders
+and above them, so nothing a run wrote is missed:
+
+    python undo.py --list
+    python undo.py --root /mnt/manga --root /mnt/webtoons --list
+    python undo.py --last
+    python undo.py --run 20240101-120000-4242-1
+    python undo.py --file "Series/ch001.cbz"
+    python undo.py --since 2024-01-01T12:00 --until 2024-01-01T13:00
+
+A file is only restored when it still has the signature of its most recent
+journaled write, so changes made outside these tools are never clobbered
+(--force overrides that). The journal keeps only a hash of the old cover,
+so a changed cover is reported but not restored.
+"""
+import argparse
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import threading
+import zipfile
+from datetime import datetime
+
+from compression import DEFAULT_POLICY
+import kavita
+
+JOURNAL_NAME = ".comicinfo_undo.jsonl.gz"
+SAVE_PREFIX = "save-"  # single-file saves from the editor
+UNDO_PREFIX = "undo-"
+COVER_NAMES = ['folder.jpg', 'cover.jpg', '000.jpg', '0001.jpg']
+
+_lock = threading.Lock()
+_run = None
+_roots = []
+_counter = itertools.count(1)
+
+
+def run_id(prefix: str = "") -> str:
+    """A fresh run id that leaves the current run alone; pass it to record()."""
+    # The counter keeps ids made within the same second apart
+    return prefix + datetime.now().strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}-{next(_counter)}"
+
+
+def new_run(prefix: str = "") -> str:
+    """Start a new run id; records written from now on belong to it."""
+    global _run
+    _run = run_id(prefix)
+    return _run
+
+
+def current_run() -> str:
+    return _run or new_run()
+
+
+def set_library_roots(roots) -> None:
+    """Archives under one of these folders journal to that folder."""
+    _roots[:] = [os.path.abspath(root) for root in roots]
+
+
+def journal_path(archive_path: str) -> str:
+    # Root/.../Series/chapter.cbz -> Root/.comicinfo_undo.jsonl.gz
+    override = os.environ.get("CBZ_UNDO_JOURNAL")
+    if override:
+        return override
+    path = os.path.abspath(archive_path)
+    roots = [root for root in _roots if path.startswith(os.path.join(root, ""))]
+    if roots:
+        return os.path.join(max(roots, key=len), JOURNAL_NAME)
+    # Library/Series/chapter.cbz -> Library/.comicinfo_undo.jsonl.gz
+    library = os.path.dirname(os.path.dirname(path))
+    return os.path.join(library, JOURNAL_NAME)
+
+
+def find_journals(folders) -> list[str]:
+    """Every journal in, below or above the given folders."""
+    override = os.environ.get("CBZ_UNDO_JOURNAL")
+    if override:
+        return [override]
+    found = []
+    for folder in folders:
+        folder = os.path.abspath(folder)
+        ancestor = os.path.dirname(folder)
+        while True:
+            if os.path.isfile(os.path.join(ancestor, JOURNAL_NAME)):
+                found.append(os.path.join(ancestor, JOURNAL_NAME))
+            if os.path.dirname(ancestor) == ancestor:
+                break
+            ancestor = os.path.dirname(ancestor)
+        for dirpath, _, filenames in os.walk(folder):
+            if JOURNAL_NAME in filenames:
+                found.append(os.path.join(dirpath, JOURNAL_NAME))
+    return list(dict.fromkeys(found))
+
+
+def file_signature(path: str) -> list:
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def cover_name(names) -> str | None:
+    return next((name for name in names if os.path.basename(name).lower() in COVER_NAMES), None)
+
+
+def snapshot(zipf: zipfile.ZipFile) -> dict:
+    """Capture what a write is about to overwrite."""
+    names = zipf.namelist()
+    xml = zipf.read("ComicInfo.xml") if "ComicInfo.xml" in names else None
+    cover = cover_name(names)
+    return {
+        "comicinfo": xml.decode("utf-8", errors="surrogateescape") if xml is not None else None,
+        "cover": hashlib.sha256(zipf.read(cover)).hexdigest() if cover else None,
+    }
+
+
+def snapshot_path(archive_path: str) -> dict:
+    with zipfile.ZipFile(archive_path, 'r') as zipf:
+        return snapshot(zipf)
+
+
+def record(archive_path: str, previous: dict, run: str | None = None) -> None:
+    """Append the pre-write snapshot once the new archive is in place."""
+    entry = {
+        "run": run or current_run(),
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "path": os.path.abspath(archive_path),
+        "signature": file_signature(archive_path),
+        **previous,
+    }
+    line = (json.dumps(entry) + "\n").encode("utf-8")
+    with _lock:
+        with gzip.open(journal_path(archive_path), "ab") as f:
+            f.write(line)
+
+
+def load_entries(path: str) -> list[dict]:
+    entries = []
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        pass
+    except (EOFError, gzip.BadGzipFile):
+        pass  # torn last member from an interrupted write
+    return entries
+
+
+def load_journals(paths) -> list[dict]:
+    # One time-ordered history, whichever journal each record landed in
+    entries = [entry for path in paths for entry in load_entries(path)]
+    entries.sort(key=lambda entry: entry["time"])
+    return entries
+
+
+def list_runs(entries) -> list[tuple[str, str, int]]:
+    runs = {}
+    for entry in entries:
+        first, count = runs.get(entry["run"], (entry["time"], 0))
+        runs[entry["run"]] = (first, count + 1)
+    return [(run, first, count) for run, (first, count) in runs.items()]
+
+
+def last_run(entries, exclude=()) -> str | None:
+    """The most recent run whose id does not start with one of the exclude prefixes."""
+    for entry in reversed(entries):
+        if not entry["run"].startswith(tuple(exclude)):
+            return entry["run"]
+    return None
+
+
+def select(entries, file=None, run=None, since=None, until=None, last=False) -> list[dict]:
+    if last and entries:
+        run = last_run(entries)
+    selected = entries
+    if file is not None:
+        file = os.path.abspath(file)
+        selected = [e for e in selected if e["path"] == file]
+        if run is None and since is None and until is None and selected:
+            selected = selected[-1:]  # a file on its own undoes its latest change
+    if run is not None:
+        selected = [e for e in selected if e["run"] == run]
+    if since is not None:
+        selected = [e for e in selected if e["time"] >= since]
+    if until is not None:
+        selected = [e for e in selected if e["time"] <= until]
+    return selected
+
+
+def restore_comicinfo(archive_path: str, comicinfo: str | None) -> dict:
+    """Put back a previous ComicInfo.xml (or remove it if there was none)."""
+    temp_path = archive_path + ".tmp"
+    with zipfile.ZipFile(archive_path, 'r') as zin:
+        previous = snapshot(zin)
+        members = [(item.filename, zin.read(item), item) for item in zin.infolist()
+                   if item.filename != "ComicInfo.xml"]
+        if comicinfo is not None:
+            members.append(("ComicInfo.xml", comicinfo.encode("utf-8", errors="surrogateescape"),
+                            zin.NameToInfo.get("ComicInfo.xml")))
+        with zipfile.ZipFile(temp_path, 'w') as zout:
+            DEFAULT_POLICY.write_members(zout, members)
+    os.replace(temp_path, archive_path)
+    kavita.record_change(archive_path)
+    return previous
+
+
+def undo(entries, selected, force=False, dry_run=False) -> tuple[list[str], list[str]]:
+    latest = {}
+    for entry in entries:
+        latest[entry["path"]] = entry
+    earliest = {}
+    for entry in selected:
+        earliest.setdefault(entry["path"], entry)
+    selected_ids = {id(e) for e in selected}
+
+    run = new_run(UNDO_PREFIX) if not dry_run else None
+    restored, skipped = [], []
+    for path, entry in earliest.items():
+        if id(latest[path]) not in selected_ids and not force:
+            skipped.append(f"{path}: changed again by run {latest[path]['run']}")
+            continue
+        try:
+            if not force and file_signature(path) != latest[path]["signature"]:
+                skipped.append(f"{path}: modified outside the journal")
+                continue
+            if dry_run:
+                restored.append(path)
+                continue
+            previous = restore_comicinfo(path, entry["comicinfo"])
+        except (OSError, zipfile.BadZipFile) as e:
+            skipped.append(f"{path}: {e}")
+            continue
+        record(path, previous, run=run)
+        if previous["cover"] != entry["cover"]:
+            print(f"Cover of {path} has changed since and cannot be restored from the journal")
+        restored.append(path)
+    return restored, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Undo ComicInfo edits recorded in the undo journal.")
+    parser.add_argument("--journal", help="read only this journal file")
+    parser.add_argument("--root", action="append", dest="roots",
+                        help="library root to collect journals from (repeatable, default: current directory)")
+    parser.add_argument("--list", action="store_true", help="list recorded runs")
+    parser.add_argument("--last", action="store_true", help="undo the most recent run")
+    parser.add_argument("--run", help="undo one run")
+    parser.add_argument("--file", help="undo one archive (its latest change unless combined with other filters)")
+    parser.add_argument("--since", help="ISO time, e.g. 2024-01-01T12:00")
+    parser.add_argument("--until", help="ISO time")
+    parser.add_argument("--force", action="store_true", help="restore even if the archive changed since")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    journals = [args.journal] if args.journal else find_journals(args.roots or ["."])
+    entries = load_journals(journals)
+    if args.list:
+        for run, first, count in list_runs(entries):
+            print(f"{run}  {first}  {count} file(s)")
+        return
+    if not (args.last or args.run or args.file or args.since or args.until):
+        parser.error("choose what to undo: --last, --run, --file, --since/--until")
+
+    selected = select(entries, file=args.file, run=args.run, since=args.since, until=args.until, last=args.last)
+    restored, skipped = undo(entries, selected, force=args.force, dry_run=args.dry_run)
+    for line in skipped:
+        print(f"Skipped {line}")
+    print(f"{'Would restore' if args.dry_run else 'Restored'} {len(restored)} file(s)")
+    kavita.scan_changed()
+
+
+if __name__ == "__main__":
+    main()
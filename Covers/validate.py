@@ -0,0 +1,172 @@
+"""
+ComicInfo validation shared by every write path.
+
+check() first coerces values that are unambiguous: empty/"None" fields are
+dropped (or, if the loaded file had a value there, that value is kept, so a
+source with nothing to say never deletes a field), "3.0" becomes 3 for
+integer fields, enum values get their schema casing, a boolean left in a
+language field (Locale="True") is dropped, and <Page> boolean attributes get
+xs:boolean casing (DoublePage="True" -> "true"). A fractional Volume ("1.5")
+is reported but written, since Kavita reads it. Whatever is still wrong is
+then checked against ComicInfo.xsd, which is compiled once per process with
+lxml when it is installed.
+
+Only schema fields are validated; our own tags (mangaId, coverImage, ...)
+pass through untouched. check() raises ValidationError listing every
+problem, so callers can stop before writing anything.
+"""
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+
+from comicinfo import ComicInfo, KNOWN_FIELDS, format_value
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ComicInfo.xsd")
+EMPTY_VALUES = {"", "none", "null"}
+ENUMS = {
+    "BlackAndWhite": ["Unknown", "No", "Yes"],
+    "Manga": ["Unknown", "No", "Yes", "YesAndRightToLeft"],
+    "AgeRating": ["Unknown", "Adults Only 18+", "Early Childhood", "Everyone", "Everyone 10+", "G",
+                  "Kids to Adults", "M", "MA15+", "Mature 17+", "PG", "R18+", "Rating Pending", "Teen", "X18+"],
+}
+LANGUAGE_FIELDS = ("LanguageISO", "Locale")
+LANGUAGE_CODE = re.compile(r"^[A-Za-z]{2,3}(?:[-_][A-Za-z0-9]{2,8})*$")
+PAGE_BOOLEANS = ("DoublePage",)
+LENIENT_FIELDS = ("Volume",)  # schema integers that are reported, not refused, when fractional
+
+_schema = None
+_schema_lock = threading.Lock()
+
+
+class ValidationError(ValueError):
+    def __init__(self, label: str, errors: list[str]):
+        super().__init__(f"{label}: " + "; ".join(errors))
+        self.label = label
+        self.errors = errors
+
+
+def schema():
+    """The compiled ComicInfo schema, or None without lxml."""
+    global _schema
+    if _schema is None:
+        with _schema_lock:
+            if _schema is None:
+                try:
+                    from lxml import etree
+                except ImportError:
+                    _schema = False
+                else:
+                    _schema = etree.XMLSchema(etree.parse(SCHEMA_PATH))
+    return _schema or None
+
+
+def coerce_number(text: str, kind):
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    if kind is int:
+        return int(number) if number.is_integer() else None
+    return number
+
+
+def coerce(comicinfo: ComicInfo) -> tuple[list[str], list[str]]:
+    """Fix what can be fixed in place. Returns (fixes, errors)."""
+    fixes, errors = [], []
+    original = None
+    for tag in comicinfo.tags():
+        if tag == "Pages":
+            fixes.extend(coerce_pages(comicinfo.pages or []))
+            continue
+        value = comicinfo.get(tag)
+        text = format_value(value)
+        if text is None or text.strip().lower() in EMPTY_VALUES:
+            if original is None:
+                original = comicinfo.original()
+            previous = original.get_text(tag)
+            if previous is not None and previous.strip().lower() not in EMPTY_VALUES:
+                comicinfo.set(tag, previous)
+                fixes.append(f"{tag}: kept {previous!r} over an empty value")
+            else:
+                comicinfo.remove(tag)
+                fixes.append(f"{tag}: dropped empty value")
+            continue
+        text = text.strip()
+        kind = KNOWN_FIELDS.get(tag)
+        if kind in (int, float) and isinstance(value, str):
+            number = coerce_number(text, kind)
+            if number is None and tag in LENIENT_FIELDS and coerce_number(text, float) is not None:
+                fixes.append(f"{tag}: {text!r} is not an integer; written as is")
+            elif number is None:
+                errors.append(f"{tag}: {text!r} is not {'an integer' if kind is int else 'a number'}")
+            else:
+                comicinfo.set(tag, number)
+                fixes.append(f"{tag}: {text!r} -> {number}")
+        elif tag in ENUMS and text not in ENUMS[tag]:
+            canonical = next((v for v in ENUMS[tag] if v.lower() == text.lower()), None)
+            if canonical is None:
+                errors.append(f"{tag}: {text!r} is not one of {', '.join(ENUMS[tag])}")
+            else:
+                comicinfo.set(tag, canonical)
+                fixes.append(f"{tag}: {text!r} -> {canonical!r}")
+        elif tag in LANGUAGE_FIELDS and not LANGUAGE_CODE.match(text):
+            if text.lower() in ("true", "false"):
+                comicinfo.remove(tag)
+                fixes.append(f"{tag}: dropped {text!r}")
+            else:
+                errors.append(f"{tag}: {text!r} is not a language code")
+    return fixes, errors
+
+
+def coerce_pages(pages: list[dict]) -> list[str]:
+    fixed = {}
+    for page in pages:
+        for attribute in PAGE_BOOLEANS:
+            value = page.get(attribute)
+            if value is None:
+                continue
+            text = str(value).strip().lower()
+            if text in ("true", "false") and value != text:
+                page[attribute] = text
+                fixed[(attribute, str(value), text)] = fixed.get((attribute, str(value), text), 0) + 1
+    return [f"Pages: {attribute} {before!r} -> {after!r} on {count} page(s)"
+            for (attribute, before, after), count in fixed.items()]
+
+
+def schema_errors(comicinfo: ComicInfo) -> list[str]:
+    compiled = schema()
+    if compiled is None:
+        return []
+    from lxml import etree
+
+    # Only the schema fields; our own tags are not part of ComicInfo
+    # Fractional lenient fields were already reported by coerce
+    skip = {tag for tag in LENIENT_FIELDS if isinstance(comicinfo.get(tag), str)}
+    full = comicinfo.to_element()
+    root = ET.Element("ComicInfo")
+    root.extend(child for child in full
+                if (child.tag in KNOWN_FIELDS or child.tag == "Pages") and child.tag not in skip)
+    document = etree.fromstring(ET.tostring(root))
+    if compiled.validate(document):
+        return []
+    return [e.message for e in compiled.error_log]
+
+
+def check(comicinfo: ComicInfo, label: str = "ComicInfo.xml") -> list[str]:
+    """Coerce and validate; returns the fixes applied or raises ValidationError."""
+    fixes, errors = coerce(comicinfo)
+    if not errors:
+        errors = schema_errors(comicinfo)
+    if errors:
+        raise ValidationError(label, errors)
+    return fixes
+
+
+def report(failures: dict) -> str:
+    """Readable summary of {label: [errors]} for a bulk run."""
+    lines = []
+    for label, errors in failures.items():
+        lines.append(label)
+        lines.extend(f"    {error}" for error in errors)
+    return "\n".join(lines)
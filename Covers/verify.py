@@ -0,0 +1,158 @@
+"""
+Run this from the /Manga directory
+Integrity check for CBZ archives.
+
+Checks the central directory, every local header and every member CRC.
+Stored members are CRC'd straight from the raw file stream without going
+through zipfile's decoder, deflated members are streamed through it, and
+--decode also opens every image with PIL. Files are checked across a
+process pool with bounded read buffers; corrupt ones go to the report and
+a quarantine list.
+
+    python verify.py --report verify.csv --quarantine quarantine.txt
+    python verify.py --decode Series/ch001.cbz
+
+check_archive() is the cheap structural check (central directory and local
+headers only) that the write paths run before doing any expensive work.
+"""
+import argparse
+import csv
+import os
+import struct
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from discovery import discover, add_discovery_arguments
+
+CHUNK_SIZE = 1024 * 1024
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp")
+
+
+class CorruptArchive(Exception):
+    pass
+
+
+def read_local_header(raw, info: zipfile.ZipInfo) -> int:
+    """Validate a member's local header and return the offset of its data."""
+    raw.seek(info.header_offset)
+    header = raw.read(zipfile.sizeFileHeader)
+    if len(header) != zipfile.sizeFileHeader:
+        raise CorruptArchive(f"{info.filename}: truncated local header")
+    fields = struct.unpack(zipfile.structFileHeader, header)
+    if fields[0] != zipfile.stringFileHeader:
+        raise CorruptArchive(f"{info.filename}: bad local header signature")
+    if fields[4] != info.compress_type:
+        raise CorruptArchive(f"{info.filename}: compression method differs from central directory")
+    name_length, extra_length = fields[10], fields[11]
+    name = raw.read(name_length)
+    encoding = "utf-8" if fields[3] & 0x800 else "cp437"
+    if name.decode(encoding, errors="replace") != info.orig_filename:
+        raise CorruptArchive(f"{info.filename}: local header names {name!r}")
+    return info.header_offset + zipfile.sizeFileHeader + name_length + extra_length
+
+
+def check_archive(path: str) -> None:
+    """Raise CorruptArchive unless the central directory and local headers are sound."""
+    try:
+        with zipfile.ZipFile(path) as zf, open(path, "rb") as raw:
+            file_size = os.fstat(raw.fileno()).st_size
+            for info in zf.infolist():
+                data_offset = read_local_header(raw, info)
+                if data_offset + info.compress_size > file_size:
+                    raise CorruptArchive(f"{info.filename}: member runs past end of file")
+    except (zipfile.BadZipFile, OSError, struct.error) as e:
+        raise CorruptArchive(str(e)) from e
+
+
+def stored_crc(raw, offset: int, size: int, chunk_size: int) -> int:
+    raw.seek(offset)
+    crc = 0
+    remaining = size
+    while remaining:
+        chunk = raw.read(min(chunk_size, remaining))
+        if not chunk:
+            raise CorruptArchive("unexpected end of file")
+        crc = zlib.crc32(chunk, crc)
+        remaining -= len(chunk)
+    return crc
+
+
+def verify_archive(path: str, decode: bool = False, chunk_size: int = CHUNK_SIZE) -> dict:
+    result = {"file": path, "members": 0, "ok": True, "error": ""}
+    try:
+        check_archive(path)
+        with zipfile.ZipFile(path) as zf, open(path, "rb") as raw:
+            for info in zf.infolist():
+                result["members"] += 1
+                if info.is_dir():
+                    continue
+                if info.flag_bits & 0x1:
+                    raise CorruptArchive(f"{info.filename}: encrypted member")
+                if info.compress_type == zipfile.ZIP_STORED:
+                    offset = read_local_header(raw, info)
+                    if stored_crc(raw, offset, info.compress_size, chunk_size) != info.CRC:
+                        raise CorruptArchive(f"{info.filename}: CRC mismatch")
+                else:
+                    # zipfile checks the CRC once the stream is exhausted
+                    with zf.open(info) as member:
+                        while member.read(chunk_size):
+                            pass
+                if decode and info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                    decode_image(zf, info)
+    except (CorruptArchive, zipfile.BadZipFile, OSError, zlib.error, EOFError,
+            RuntimeError, NotImplementedError) as e:  # encrypted members / unsupported compression
+        result["ok"] = False
+        result["error"] = str(e)
+    return result
+
+
+def decode_image(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> None:
+    from PIL import Image
+
+    try:
+        with zf.open(info) as member:
+            Image.open(member).load()
+    except Exception as e:
+        raise CorruptArchive(f"{info.filename}: image does not decode ({e})") from e
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify CBZ archive integrity.")
+    parser.add_argument("files", nargs="*", help="specific archives (default: discover the library)")
+    parser.add_argument("--decode", action="store_true", help="also decode every image")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="read buffer size in bytes")
+    parser.add_argument("--report", default="verify_report.csv")
+    parser.add_argument("--quarantine", default="quarantine.txt", help="list of corrupt archives")
+    add_discovery_arguments(parser)
+    args = parser.parse_args()
+
+    paths = args.files or [os.path.join(unit.folder, name)
+                           for unit in discover(args.roots or ["."], ignore=args.ignore) for name in unit.files]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=args.processes) as pool:
+        futures = {pool.submit(verify_archive, path, args.decode, args.chunk_size): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"file": futures[future], "members": 0, "ok": False, "error": str(e)}
+            if not result["ok"]:
+                print(f"CORRUPT {result['file']}: {result['error']}")
+            results.append(result)
+
+    results.sort(key=lambda r: r["file"])
+    with open(args.report, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["file", "members", "ok", "error"])
+        writer.writeheader()
+        writer.writerows(results)
+    corrupt = [r["file"] for r in results if not r["ok"]]
+    with open(args.quarantine, "w", encoding="utf-8") as f:
+        f.writelines(path + "\n" for path in corrupt)
+    print(f"Checked {len(results)} archives, {len(corrupt)} corrupt. Report: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Run this from the /Manga directory
+Watches the library for newly arrived chapters and runs only those files
+through the metadata and cover stages.
+
+Uses inotify (via the inotify_simple package) when available and falls back
+to polling otherwise. A file is only processed once its size and mtime have
+stopped changing for --settle seconds and it opens as a valid zip.
+"""
+import argparse
+import os
+import time
+import zipfile
+from pathlib import Path
+
+import fetch_covers
+import fetch_metadata
+import kavita
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+CBZ_SUFFIXES = (".cbz",)
+
+
+def is_series_folder(name: str) -> bool:
+    return not name.startswith("_") and not name.startswith(".")
+
+
+def file_signature(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def is_complete_zip(path: str) -> bool:
+    try:
+        with zipfile.ZipFile(path, "r"):
+            return True
+    except (zipfile.BadZipFile, OSError):
+        return False
+
+
+def scan_library() -> dict:
+    found = {}
+    for folder in Path().iterdir():
+        if not folder.is_dir() or not is_series_folder(folder.name):
+            continue
+        for f in folder.iterdir():
+            if f.suffix.lower() in CBZ_SUFFIXES and f.is_file():
+                found[f"{folder.name}/{f.name}"] = file_signature(str(f))
+    return found
+
+
+class PendingFiles:
+    """Tracks arrivals until they settle, then hands them out grouped by series."""
+
+    def __init__(self, settle_seconds: float):
+        self.settle_seconds = settle_seconds
+        self.pending = {}  # relative path -> (signature, last change time)
+        self.processed = {}  # relative path -> signature after our own write
+
+    def touch(self, rel_path: str) -> None:
+        signature = file_signature(rel_path)
+        if signature is None:
+            self.pending.pop(rel_path, None)
+            return
+        # Ignore the events caused by our own rewrites
+        if self.processed.get(rel_path) == signature:
+            return
+        previous = self.pending.get(rel_path)
+        if previous is None or previous[0] != signature:
+            self.pending[rel_path] = (signature, time.monotonic())
+
+    def pop_settled(self) -> dict:
+        now = time.monotonic()
+        batches = {}
+        for rel_path, (signature, changed_at) in list(self.pending.items()):
+            current = file_signature(rel_path)
+            if current is None:
+                del self.pending[rel_path]
+                continue
+            if current != signature:
+                self.pending[rel_path] = (current, now)
+                continue
+            if now - changed_at < self.settle_seconds or not is_complete_zip(rel_path):
+                continue
+            del self.pending[rel_path]
+            folder, filename = rel_path.split("/", 1)
+            batches.setdefault(folder, []).append(filename)
+        return batches
+
+    def mark_processed(self, folder: str, filenames) -> None:
+        for filename in filenames:
+            rel_path = f"{folder}/{filename}"
+            self.pending.pop(rel_path, None)
+            self.processed[rel_path] = file_signature(rel_path)
+
+
+def process_batches(batches: dict, pending: PendingFiles) -> None:
+    for folder, filenames in batches.items():
+        filenames.sort()
+        print(f"Processing {len(filenames)} new file(s) in {folder}")
+        try:
+            fetch_metadata.process_folder(folder, filenames)
+            fetch_covers.process_folder(folder, filenames)
+        except Exception as e:
+            # Not marked processed, so the files are picked up again when they next change
+            print(f"Failed to process {folder}: {e}")
+            continue
+        pending.mark_processed(folder, filenames)
+    if batches:
+        kavita.scan_changed()
+
+
+def watch_polling(pending: PendingFiles, interval: float) -> None:
+    known = scan_library()
+    while True:
+        time.sleep(interval)
+        current = scan_library()
+        for rel_path, signature in current.items():
+            if known.get(rel_path) != signature:
+                pending.touch(rel_path)
+        known = current
+        process_batches(pending.pop_settled(), pending)
+
+
+def watch_inotify(pending: PendingFiles, interval: float) -> None:
+    inotify = INotify()
+    root_flags = flags.CREATE | flags.MOVED_TO | flags.ONLYDIR
+    file_flags = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.MODIFY
+    watches = {inotify.add_watch(".", root_flags): None}
+
+    def add_series(name):
+        if is_series_folder(name) and os.path.isdir(name):
+            watches[inotify.add_watch(name, file_flags)] = name
+
+    for folder in Path().iterdir():
+        add_series(folder.name)
+
+    while True:
+        for event in inotify.read(timeout=int(interval * 1000)):
+            folder = watches.get(event.wd)
+            if folder is None:
+                if event.mask & flags.ISDIR:
+                    add_series(event.name)
+                    # A folder moved in with chapters inside raises no events for them
+                    if is_series_folder(event.name) and os.path.isdir(event.name):
+                        for f in Path(event.name).iterdir():
+                            if f.suffix.lower() in CBZ_SUFFIXES and f.is_file():
+                                pending.touch(f"{event.name}/{f.name}")
+                continue
+            if event.name.lower().endswith(CBZ_SUFFIXES):
+                pending.touch(f"{folder}/{event.name}")
+        process_batches(pending.pop_settled(), pending)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process newly arrived CBZ files as they land.")
+    parser.add_argument("--settle", type=float, default=5.0,
+                        help="seconds a file must stay unchanged before it is processed")
+    parser.add_argument("--interval", type=float, default=2.0, help="poll / wake-up interval in seconds")
+    parser.add_argument("--poll", action="store_true", help="force polling even if inotify is available")
+    args = parser.parse_args()
+
+    pending = PendingFiles(args.settle)
+    if INotify is not None and not args.poll:
+        print("Watching with inotify")
+        watch_inotify(pending, args.interval)
+    else:
+        print("Watching with polling")
+        watch_polling(pending, args.interval)
+
+
+if __name__ == "__main__":
+    main()
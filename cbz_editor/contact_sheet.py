@@ -0,0 +1,96 @@
+"""
+Contact-sheet thumbnails for every page of an archive.
+
+Pages are decoded at reduced size (JPEG draft mode) in a thread pool, a
+small batch per task so the editor's grid fills in as batches finish.
+Threads rather than processes: forking the running Tk app is unsafe, and
+Pillow releases the GIL while it decodes.
+Finished sheets are kept per archive signature, so reopening a chapter shows
+its strip straight away.
+"""
+import io
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from pages import page_names
+from workspace import file_signature
+
+THUMB_SIZE = (120, 170)
+BATCH_SIZE = 8
+
+
+def render_batch(path, names, size=THUMB_SIZE):
+    """Runs on a pool thread; returns (name, (w, h), rgb bytes) per page."""
+    from PIL import Image
+
+    results = []
+    with zipfile.ZipFile(path, 'r') as zipf:
+        for name in names:
+            try:
+                image = Image.open(io.BytesIO(zipf.read(name)))
+                image.draft("RGB", size)  # JPEG decodes straight to a reduced scale
+                image.thumbnail(size)
+                image = image.convert("RGB")
+                results.append((name, image.size, image.tobytes()))
+            except Exception:
+                results.append((name, None, None))
+    return results
+
+
+class ContactSheets:
+    def __init__(self, max_entries=3, workers=None):
+        self.max_entries = max_entries
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.sheets = OrderedDict()  # (path, signature) -> [(name, size, rgb)], most recent last
+        self.lock = threading.Lock()
+        self.pool = None
+
+    def _pool(self):
+        # Worker threads are only started the first time a sheet is opened
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        return self.pool
+
+    def pages(self, path):
+        with zipfile.ZipFile(path, 'r') as zipf:
+            return page_names(zipf.namelist())
+
+    def cached(self, path):
+        key = (os.path.abspath(path), file_signature(path))
+        with self.lock:
+            sheet = self.sheets.get(key)
+            if sheet is not None:
+                self.sheets.move_to_end(key)
+            return sheet
+
+    def render(self, path, names, deliver):
+        """
+        Render every page in names. deliver(batch) is called from a pool
+        thread as each batch finishes; it must not touch Tk widgets.
+        """
+        key = (os.path.abspath(path), file_signature(path))
+        batches = [names[i:i + BATCH_SIZE] for i in range(0, len(names), BATCH_SIZE)]
+        finished = {}
+        remaining = [len(batches)]
+
+        def done(future, batch_names):
+            try:
+                batch = future.result()
+            except Exception:
+                batch = [(name, None, None) for name in batch_names]
+            deliver(batch)
+            with self.lock:
+                finished.update((name, (name, size, rgb)) for name, size, rgb in batch)
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    self.sheets[key] = [finished[name] for name in names]
+                    while len(self.sheets) > self.max_entries:
+                        self.sheets.popitem(last=False)
+
+        pool = self._pool()
+        for batch_names in batches:
+            future = pool.submit(render_batch, path, batch_names)
+            future.add_done_callback(lambda f, b=batch_names: done(f, b))
@@ -3,16 +3,30 @@ import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from tkinter import filedialog, messagebox
 from zipfile import ZipFile
-from lxml import etree
-from PIL import Image, ImageTk, UnidentifiedImageError
 import io
 import os
-import requests
 import sv_ttk
 import sys  # at top if not already
+import threading
+import queue
 import re
 import os
-from datetime import datetime
+
+# Shared helpers live next to the library scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Covers"))
+from sidecar import read_sidecar, write_sidecar, match_confidence
+from compression import DEFAULT_POLICY
+from mangadex import API_URL, UPLOADS_URL, list_covers
+from comicinfo import ComicInfo
+from workspace import Workspace
+from contact_sheet import ContactSheets
+from save_queue import SaveJob, SaveQueue
+from verify import check_archive, CorruptArchive
+import kavita
+import undo
+import validate
+import plan
+from journal import Journal
 
 class ComicMetadataEditor(tb.Window):
     base_font = ("Segoe UI", 12)
@@ -25,15 +39,26 @@ class ComicMetadataEditor(tb.Window):
         if sys.platform == "darwin":  # macOS uses Command key
             self.bind_all("<Command-s>", lambda e: self.save_cbz())
             self.bind_all("<Command-r>", lambda e: self.reload_cbz())
+            self.bind_all("<Command-bracketright>", lambda e: self.open_adjacent_cbz(1))
+            self.bind_all("<Command-bracketleft>", lambda e: self.open_adjacent_cbz(-1))
         else:  # Windows/Linux use Control key
             self.bind_all("<Control-s>", lambda e: self.save_cbz())
             self.bind_all("<Control-r>", lambda e: self.reload_cbz())
+            self.bind_all("<Control-bracketright>", lambda e: self.open_adjacent_cbz(1))
+            self.bind_all("<Control-bracketleft>", lambda e: self.open_adjacent_cbz(-1))
 
         self.setup_menu()
         self.geometry("1200x800")
         self.fields = []
+        self.workspace = Workspace()
+        self.contact_sheets = ContactSheets()
+        # Writer thread results come back through save_results; only poll_saves touches Tk
+        self.save_results = queue.Queue()
+        self.save_queue = SaveQueue(lambda path, error: self.save_results.put((path, error)))
+        self.saves_outstanding = 0
+        self._save_status_job = None
+        self.bulk_active = set()  # abspaths a background bulk run is writing; saves to them wait for it
         self.cbz_path = None
-        self.cbz_bytes = None
         self.comicinfo_data = None
         self.cover_image = None
         self.cover_data = None
@@ -60,10 +85,14 @@ class ComicMetadataEditor(tb.Window):
         self.setup_toolbar()
         self.setup_cbz_file_list_ui()
 
-        # Bulk Editor tab
+        # Bulk Editor tab (widgets are built the first time the tab is opened)
         self.bulk_tab = tb.Frame(self.tab_control)
         self.tab_control.add(self.bulk_tab, text="Bulk Editor")
-        self.setup_bulk_editor_ui()
+        self.bulk_editor_built = False
+        self.tab_control.bind("<<NotebookTabChanged>>", self._on_main_tab_changed)
+
+        # MangaDex panel widgets are built the first time a CBZ is opened (ensure_mangadex_panel)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Vertical separator
         # Clean UI styles for modern look
@@ -81,10 +110,53 @@ class ComicMetadataEditor(tb.Window):
                         borderwidth=2)
         style.configure("TLabelframe.Label", font=self.header_font, foreground="#222222", background="")  # use "" or omit
 
+    def _on_main_tab_changed(self, event=None):
+        if self.tab_control.select() == str(self.bulk_tab):
+            self.ensure_bulk_editor()
+
+    def ensure_bulk_editor(self):
+        if not self.bulk_editor_built:
+            self.bulk_editor_built = True
+            self.setup_bulk_editor_ui()
+
+    def ensure_mangadex_panel(self):
+        if not self.mangadex_panel_built:
+            self.mangadex_panel_built = True
+            self.setup_mangadex_ui_body(self.md_frame)
+
+    def schedule_kavita_scan(self, delay_ms=5000):
+        # Coalesce saves made in quick succession into one scan per folder
+        if not os.environ.get("KAVITA_URL"):
+            return
+        if getattr(self, "_kavita_scan_job", None):
+            self.after_cancel(self._kavita_scan_job)
+        self._kavita_scan_job = self.after(delay_ms, self._run_kavita_scan)
+
+    def _run_kavita_scan(self):
+        self._kavita_scan_job = None
+        threading.Thread(target=kavita.scan_changed, daemon=True).start()
+
+    def set_save_status(self, text, clear_after_ms=None):
+        if self._save_status_job:
+            self.after_cancel(self._save_status_job)
+            self._save_status_job = None
+        self.save_status_var.set(text)
+        if clear_after_ms:
+            self._save_status_job = self.after(clear_after_ms, lambda: self.set_save_status(""))
+
+    def on_close(self):
+        # Let queued saves finish before the writer thread goes away with the window
+        if self.saves_outstanding or self.save_queue.busy():
+            self.set_save_status("Finishing saves...")
+            self.after(100, self.on_close)
+            return
+        self.destroy()
+
     def get_current_metadata_dict(self):
         return {f[0].get().strip(): f[1].get().strip() for f in self.fields if f is not None}
 
     def resolve_template(self, template, metadata, filename, index=None):
+        from datetime import datetime
         result = template
         # Replace filename placeholder
         print(result)
@@ -141,6 +213,21 @@ class ComicMetadataEditor(tb.Window):
         )
         apply_btn.pack(pady=10)
 
+        plan_row = tb.Frame(self.bulk_right_frame)
+        plan_row.pack(pady=(0, 10))
+        tb.Button(plan_row, text="Save Plan...", bootstyle="secondary-outline",
+                  command=self.save_bulk_plan).pack(side="left", padx=5)
+        tb.Button(plan_row, text="Apply Plan...", bootstyle="secondary-outline",
+                  command=self.apply_plan_file).pack(side="left", padx=5)
+
+        self.bulk_pages_btn = tb.Button(self.bulk_right_frame, text="Generate Page Info", bootstyle="secondary",
+                                        command=self.bulk_generate_pages)
+        self.bulk_pages_btn.pack(pady=(0, 10))
+
+        self.bulk_covers_btn = tb.Button(self.bulk_right_frame, text="Apply Volume Covers", bootstyle="secondary",
+                                         command=self.bulk_apply_volume_covers)
+        self.bulk_covers_btn.pack(pady=(0, 10))
+
         # 🔹 Add Load Button at the top
         load_btn = tb.Button(self.bulk_right_frame, text="Load CBZ Files", bootstyle="primary",
                              command=self.load_bulk_cbz_files)
@@ -203,9 +290,7 @@ class ComicMetadataEditor(tb.Window):
         path = self.bulk_cbz_paths[idx]
 
         try:
-            with open(path, 'rb') as f:
-                cbz_bytes = f.read()
-            with ZipFile(io.BytesIO(cbz_bytes), 'r') as zipf:
+            with ZipFile(path, 'r') as zipf:
                 if 'ComicInfo.xml' in zipf.namelist():
                     xml_data = zipf.read('ComicInfo.xml').decode(errors="replace")
                 else:
@@ -263,7 +348,7 @@ class ComicMetadataEditor(tb.Window):
             messagebox.showwarning("No Fields", "No metadata fields to apply.")
             return
 
-        files = self.bulk_file_listbox.get(0, "end")
+        files = self.bulk_cbz_listbox.get(0, "end")
         if not files:
             messagebox.showwarning("No Files", "No CBZ files selected.")
             return
@@ -281,52 +366,92 @@ class ComicMetadataEditor(tb.Window):
             messagebox.showwarning("Empty Fields", "All fields are blank.")
             return
 
-        failed = []
-
-        for index, path in enumerate(self.bulk_cbz_paths):
-            with open(path, "rb") as f:
-                cbz_bytes = f.read()
+        entries, failed, invalid = self.plan_bulk_metadata(fields_to_apply)
+        if invalid:
+            messagebox.showerror("Invalid Metadata",
+                                 "Nothing was written.\n\n" + validate.report(invalid))
+            return
 
-            try:
-                with ZipFile(io.BytesIO(cbz_bytes), 'r') as zipf:
-                    if 'ComicInfo.xml' in zipf.namelist():
-                        xml_data = zipf.read('ComicInfo.xml')
-                        root = etree.fromstring(xml_data)
-                    else:
-                        root = etree.Element("ComicInfo")
-
-                    # Convert existing to dict
-                    current_data = {child.tag: child.text or "" for child in root}
-
-                    # Apply each field
-                    for key_var, val_var, *_ in self.bulk_fields:
-                        key = key_var.get().strip()
-                        raw_val = str(val_var.get().strip())
-                        if key:
-                            resolved = self.resolve_template(raw_val, current_data, path, index=index)
-                            existing = root.find(key)
-                            if existing is not None:
-                                existing.text = resolved
-                            else:
-                                etree.SubElement(root, key).text = resolved
-
-                # Save new CBZ
-                temp_cbz = path + ".tmp"
-                with ZipFile(io.BytesIO(cbz_bytes), 'r') as zin, ZipFile(temp_cbz, 'w') as zout:
-                    for item in zin.infolist():
-                        if item.filename != 'ComicInfo.xml':
-                            zout.writestr(item, zin.read(item))
-                    zout.writestr("ComicInfo.xml",
-                                  etree.tostring(root, pretty_print=True, encoding="utf-8", xml_declaration=True))
-                os.replace(temp_cbz, path)
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to update {os.path.basename(path)}:\n{e}")
+        busy = self.busy_paths(entry["path"] for entry in entries)
+        entries = [entry for entry in entries if entry["path"] not in busy]
+        failed += [(os.path.basename(path), "save in progress") for path in busy]
+        run = undo.new_run()
+        stats_start = DEFAULT_POLICY.stats.snapshot()
+        results = plan.apply_plan({"entries": entries}, Journal(None), run=run)
+        failed += [(os.path.basename(r["path"]), r["error"]) for r in results if r["status"] != "written"]
 
+        stats = DEFAULT_POLICY.stats.report(since=stats_start)
+        self.schedule_kavita_scan()
         if failed:
             messagebox.showerror("Some Files Failed",
-                                 f"{len(failed)} files failed:\n\n" + "\n".join(f[0] for f in failed))
+                                 f"{len(failed)} files failed:\n\n" + "\n".join(f"{name}: {error}" for name, error in failed)
+                                 + f"\n\n{stats}")
         else:
-            messagebox.showinfo("Done", "Metadata applied to all selected CBZ files.")
+            messagebox.showinfo("Done", f"Metadata applied to all selected CBZ files.\n\n{stats}")
+
+    def plan_bulk_metadata(self, fields_to_apply):
+        # Read-only: resolve templates and validate every file before anything is written
+        entries, failed, invalid = [], [], {}
+        for index, path in enumerate(self.bulk_cbz_paths):
+            try:
+                check_archive(path)
+                with ZipFile(path, 'r') as zipf:
+                    comicinfo = ComicInfo.from_zip(zipf)
+                current_data = comicinfo.as_dict()
+                updates = {key: self.resolve_template(raw_val, current_data, path, index=index)
+                           for key, raw_val in fields_to_apply}
+                entry = plan.plan_entry(path, updates, comicinfo=comicinfo)
+            except validate.ValidationError as e:
+                invalid[os.path.basename(path)] = e.errors
+                continue
+            except (CorruptArchive, OSError) as e:
+                failed.append((os.path.basename(path), str(e)))
+                continue
+            if entry:
+                entries.append(entry)
+        return entries, failed, invalid
+
+    def save_bulk_plan(self):
+        fields_to_apply = [(f[0].get().strip(), str(f[1].get()).strip())
+                           for f in self.bulk_fields if f is not None and f[0].get().strip()]
+        if not fields_to_apply or not getattr(self, "bulk_cbz_paths", None):
+            messagebox.showwarning("Nothing to Plan", "Load CBZ files and add at least one field.")
+            return
+        entries, failed, invalid = self.plan_bulk_metadata(fields_to_apply)
+        if invalid:
+            messagebox.showerror("Invalid Metadata", validate.report(invalid))
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Plan files", "*.json")])
+        if not path:
+            return
+        plan.write_plan(path, entries, "cbz_editor")
+        messagebox.showinfo("Plan Saved", f"Planned changes to {len(entries)} file(s)."
+                            + (f"\n{len(failed)} file(s) could not be read." if failed else ""))
+
+    def apply_plan_file(self):
+        path = filedialog.askopenfilename(filetypes=[("Plan files", "*.json")])
+        if not path:
+            return
+        try:
+            loaded = plan.read_plan(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to read plan:\n{e}")
+            return
+        if not messagebox.askyesno("Apply Plan", f"Apply {len(loaded['entries'])} planned change(s) "
+                                                 f"from {loaded['source']} ({loaded['created']})?"):
+            return
+        busy = self.busy_paths(entry["path"] for entry in loaded["entries"])
+        loaded = dict(loaded, entries=[entry for entry in loaded["entries"] if entry["path"] not in busy])
+        run = undo.new_run()
+        results = plan.apply_plan(loaded, Journal(path + ".journal", resume=True), run=run)
+        for result in results:
+            self.workspace.invalidate(result["path"])
+        self.schedule_kavita_scan()
+        problems = [f"{os.path.basename(r['path'])}: {r['error']}" for r in results if r["status"] != "written"]
+        problems += [f"{os.path.basename(p)}: save in progress, apply the plan again later" for p in busy]
+        written = sum(r["status"] == "written" for r in results)
+        messagebox.showinfo("Apply Plan", f"Wrote {written} file(s)."
+                            + ("\n\nNot written:\n" + "\n".join(problems) if problems else ""))
 
     def remove_bulk_field(self, index):
         if self.bulk_fields[index] is None:
@@ -353,43 +478,225 @@ class ComicMetadataEditor(tb.Window):
             messagebox.showwarning("Missing Field", "Metadata key is required.")
             return
 
-        updated = 0
+        prepared = []
+        invalid = {}
         for path in getattr(self, "bulk_cbz_paths", []):
             try:
-                with open(path, "rb") as f:
-                    data = f.read()
-
-                with ZipFile(io.BytesIO(data), 'r') as zin:
-                    namelist = zin.namelist()
-                    xml_data = zin.read("ComicInfo.xml") if "ComicInfo.xml" in namelist else b"<ComicInfo/>"
-                    root = etree.fromstring(xml_data)
-                    found = False
-                    for el in root:
-                        if el.tag.lower() == key.lower():
-                            el.text = val
-                            found = True
-                            break
-                    if not found:
-                        etree.SubElement(root, key).text = val
-                    new_xml = etree.tostring(root, pretty_print=True, encoding="utf-8", xml_declaration=True)
+                check_archive(path)
+                with ZipFile(path, 'r') as zin:
+                    comicinfo = ComicInfo.from_zip(zin)
+                # Match an existing tag case-insensitively
+                tag = next((t for t in comicinfo.tags() if t.lower() == key.lower()), key)
+                comicinfo.set(tag, val)
+                validate.check(comicinfo, os.path.basename(path))
+            except validate.ValidationError as e:
+                invalid[e.label] = e.errors
+                continue
+            except Exception as e:
+                print(f"Failed to update {path}: {e}")
+                continue
+            prepared.append((path, comicinfo))
 
+        if invalid:
+            messagebox.showerror("Invalid Metadata",
+                                 "Nothing was written.\n\n" + validate.report(invalid))
+            return
+
+        busy = self.busy_paths(path for path, _ in prepared)
+        prepared = [(path, comicinfo) for path, comicinfo in prepared if os.path.abspath(path) not in busy]
+        updated = 0
+        undo.new_run()
+        stats_start = DEFAULT_POLICY.stats.snapshot()
+        for path, comicinfo in prepared:
+            try:
                 temp_path = path + ".tmp"
-                with ZipFile(io.BytesIO(data), 'r') as zin, ZipFile(temp_path, 'w') as zout:
-                    for item in zin.infolist():
-                        if item.filename != "ComicInfo.xml":
-                            zout.writestr(item, zin.read(item))
-                    zout.writestr("ComicInfo.xml", new_xml)
+                with ZipFile(path, 'r') as zin, ZipFile(temp_path, 'w') as zout:
+                    previous = undo.snapshot(zin)
+                    members = [(item.filename, zin.read(item), item) for item in zin.infolist()
+                               if item.filename != "ComicInfo.xml"]
+                    members.append(("ComicInfo.xml", comicinfo.to_bytes(), zin.NameToInfo.get("ComicInfo.xml")))
+                    DEFAULT_POLICY.write_members(zout, members)
 
                 os.replace(temp_path, path)
+                kavita.record_change(path)
+                undo.record(path, previous)
                 updated += 1
             except Exception as e:
                 print(f"Failed to update {path}: {e}")
 
-        messagebox.showinfo("Done", f"Updated {updated} CBZ files.")
+        stats = DEFAULT_POLICY.stats.report(since=stats_start)
+        self.schedule_kavita_scan()
+        skipped = "".join(f"\nSkipped {os.path.basename(path)}: save in progress" for path in busy)
+        messagebox.showinfo("Done", f"Updated {updated} CBZ files.{skipped}\n\n{stats}")
+
+    def bulk_generate_pages(self):
+        paths = list(getattr(self, "bulk_cbz_paths", []))
+        if not paths:
+            messagebox.showwarning("No Files", "No CBZ files selected.")
+            return
+        overwrite = messagebox.askyesno("Page Info", "Regenerate <Pages> even for files that already have it?")
+        busy = self.busy_paths(paths)
+        paths = [path for path in paths if os.path.abspath(path) not in busy]
+        self.bulk_active.update(map(os.path.abspath, paths))
+        self.bulk_pages_btn.config(state="disabled", text="Generating...")
+        run = undo.new_run()
+        # The worker hands its result back through done; only poll touches Tk
+        done = queue.Queue()
+
+        def worker():
+            import multiprocessing
+            import pages
+            try:
+                # Spawned, not forked: a fork would copy the running Tk app
+                reports = pages.populate_files(paths, overwrite=overwrite, run=run,
+                                               mp_context=multiprocessing.get_context("spawn"))
+                done.put((reports, None))
+            except Exception as e:
+                done.put(([], f"Failed to generate page info:\n{e}"))
+
+        def poll():
+            try:
+                reports, error = done.get_nowait()
+            except queue.Empty:
+                self.after(100, poll)
+                return
+            self.bulk_active.difference_update(map(os.path.abspath, paths))
+            self.finish_bulk_generate_pages(reports, error, busy)
+
+        threading.Thread(target=worker, daemon=True).start()
+        poll()
+
+    def finish_bulk_generate_pages(self, reports, error=None, busy=()):
+        self.bulk_pages_btn.config(state="normal", text="Generate Page Info")
+        if error:
+            messagebox.showerror("Page Info", error)
+            return
+        for report in reports:
+            if report["written"]:
+                self.workspace.invalidate(report["file"])
+        self.schedule_kavita_scan()
+        failed = [f"{os.path.basename(r['file'])}: {r['error']}" for r in reports if r["error"]]
+        failed += [f"{os.path.basename(path)}: save in progress" for path in busy]
+        written = sum(r["written"] for r in reports)
+        message = f"Wrote page info to {written} of {len(reports)} files."
+        if failed:
+            message += "\n\nFailed:\n" + "\n".join(failed)
+        messagebox.showinfo("Page Info", message)
+
+    def bulk_apply_volume_covers(self):
+        paths = list(getattr(self, "bulk_cbz_paths", []))
+        if not paths:
+            messagebox.showwarning("No Files", "No CBZ files selected.")
+            return
+        if not messagebox.askyesno("Volume Covers",
+                                   f"Embed the MangaDex cover for each file's Volume into {len(paths)} file(s)?"):
+            return
+        busy = self.busy_paths(paths)
+        paths = [path for path in paths if os.path.abspath(path) not in busy]
+        self.bulk_active.update(map(os.path.abspath, paths))
+        self.bulk_covers_btn.config(state="disabled", text="Applying Covers...")
+        run = undo.new_run()  # passed along, so saves made meanwhile can't split this run
+        # The series fetched in the single editor only stands in for files of that same folder
+        fallback_id = None
+        if self.cbz_path and self.mangadex_id:
+            folder = os.path.dirname(os.path.abspath(self.cbz_path))
+            if all(os.path.dirname(os.path.abspath(path)) == folder for path in paths):
+                fallback_id = self.mangadex_id
+
+        skipped = [f"{os.path.basename(path)}: save in progress" for path in busy]
+        # The worker hands its result back through done; only poll touches Tk
+        done = queue.Queue()
+
+        def worker():
+            try:
+                entries, problems = self.plan_volume_covers(paths, fallback_id)
+                results = plan.apply_plan({"entries": entries}, Journal(None), workers=8, run=run)
+            except Exception as e:
+                done.put(([], [f"Failed to apply covers: {e}"]))
+                return
+            done.put((results, problems))
+
+        def poll():
+            try:
+                results, problems = done.get_nowait()
+            except queue.Empty:
+                self.after(100, poll)
+                return
+            self.finish_bulk_volume_covers(results, skipped + problems, paths)
+
+        threading.Thread(target=worker, daemon=True).start()
+        poll()
+
+    def plan_volume_covers(self, paths, fallback_id=None):
+        # Runs on a worker thread: read every Volume, list covers for all series in one batch, then plan
+        import fetch_covers
+
+        targets, problems = [], []
+        for path in paths:
+            try:
+                check_archive(path)
+                with ZipFile(path, 'r') as zipf:
+                    comicinfo = ComicInfo.from_zip(zipf)
+            except Exception as e:
+                problems.append(f"{os.path.basename(path)}: {e}")
+                continue
+            pinned = read_sidecar(os.path.dirname(path)) or {}
+            if pinned.get("confidence") == "fallback":
+                pinned = {}  # a guessed pin could embed another series' covers
+                guessed = True
+            else:
+                guessed = False
+            manga_id = comicinfo.get_text("mangaId") or pinned.get("mangaId") or fallback_id
+            if not manga_id and guessed:
+                problems.append(f"{os.path.basename(path)}: the folder's MangaDex pin is only a guess; "
+                                f"fetch the series in the single editor to confirm it")
+                continue
+            if not manga_id:
+                problems.append(f"{os.path.basename(path)}: no MangaDex ID (pin the series, or fetch it "
+                                f"in the single editor with a chapter of that folder open)")
+                continue
+            targets.append((path, comicinfo, manga_id))
+
+        if targets:
+            fetch_covers.prefetch_covers({manga_id for _, _, manga_id in targets})
+        entries = []
+        for path, comicinfo, manga_id in targets:
+            volume = comicinfo.get_text("Volume")
+            file_name = fetch_covers.get_all_covers(manga_id).get(volume)
+            if not file_name:
+                problems.append(f"{os.path.basename(path)}: no MangaDex cover for volume {volume}")
+                continue
+            try:
+                entry = plan.plan_entry(path, {"coverImage": "True"}, comicinfo=comicinfo,
+                                        cover={"name": "folder.jpg", "mangaId": manga_id, "fileName": file_name})
+            except validate.ValidationError as e:
+                problems.append(validate.report({e.label: e.errors}))
+                continue
+            entries.append(entry)
+        return entries, problems
+
+    def finish_bulk_volume_covers(self, results, problems, paths=()):
+        self.bulk_active.difference_update(map(os.path.abspath, paths))
+        self.bulk_covers_btn.config(state="normal", text="Apply Volume Covers")
+        for r in results:
+            if r["status"] == "written":
+                self.workspace.invalidate(r["path"])
+        self.schedule_kavita_scan()
+        problems = problems + [f"{os.path.basename(r['path'])}: {r['error']}" for r in results
+                               if r["status"] != "written"]
+        written = sum(r["status"] == "written" for r in results)
+        message = f"Embedded volume covers in {written} file(s)."
+        if problems:
+            message += "\n\nNot covered:\n" + "\n".join(problems)
+        messagebox.showinfo("Volume Covers", message)
+
+    def busy_paths(self, paths) -> set:
+        """Abspaths among paths with a save queued or being written; bulk runs skip them."""
+        return {path for path in map(os.path.abspath, paths) if self.save_queue.busy(path)}
 
     def clear_cbz_context(self):
+        self.ensure_mangadex_panel()
         self.cbz_path = None
-        self.cbz_bytes = None
         self.cover_image = None
         self.cover_data = None
         self.cover_name = None
@@ -421,44 +728,43 @@ class ComicMetadataEditor(tb.Window):
             messagebox.showinfo("Info", "No CBZ file loaded.")
             return
 
-        try:
-            with open(self.cbz_path, 'rb') as f:
-                self.cbz_bytes = f.read()
-            self.clear_all_fields()
-            self.cover_canvas.delete("all")
-            self.cover_image = None
-            self.cover_data = None
-            self.cover_name = None
-            # self.upload_btn.pack(pady=5)
-            # self.clear_cover_btn.pack(pady=5)
-            # self.clear_btn.pack(side="left", padx=5)
-            # self.save_btn.pack(side="left", padx=5)
-            self.cbz_file_listbox.delete(0, "end")
-
-            with ZipFile(io.BytesIO(self.cbz_bytes), 'r') as zipf:
-                for name in zipf.namelist():
-                    self.cbz_file_listbox.insert("end", name)
-                if 'ComicInfo.xml' in zipf.namelist():
-                    xml_data = zipf.read('ComicInfo.xml')
-                    self.comicinfo_data = etree.fromstring(xml_data)
-                else:
-                    self.comicinfo_data = etree.Element("ComicInfo")
-                    messagebox.showinfo("Info", "No ComicInfo.xml found. Starting with empty metadata.")
-                series_value = ""
-                for child in self.comicinfo_data:
-                    tag = child.tag
-                    text = child.text or ""
-                    if tag.lower() == "series":
-                        series_value = text
-                    self.add_field(tag, text)
-
-                # Pre-fill the MangaDex title field
-                if series_value:
-                    self.manga_title_var.set(series_value)
-
-                self.show_cover(zipf)
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to reload CBZ:\n{e}")
+        self.workspace.invalidate(self.cbz_path)
+        self.open_cbz_path(self.cbz_path)
+
+    def undo_current_file(self):
+        if not self.cbz_path:
+            messagebox.showinfo("Info", "No CBZ file loaded.")
+            return
+        entries = undo.load_journals(undo.find_journals([os.path.dirname(self.cbz_path)]))
+        self.run_undo(entries, undo.select(entries, file=self.cbz_path))
+
+    def undo_last_run(self):
+        paths = getattr(self, "bulk_cbz_paths", None) or ([self.cbz_path] if self.cbz_path else [])
+        if not paths:
+            messagebox.showinfo("Info", "Load a CBZ or a bulk folder first.")
+            return
+        entries = undo.load_journals(undo.find_journals({os.path.dirname(path) for path in paths}))
+        # Single-file saves and earlier undos are not bulk runs
+        run = undo.last_run(entries, exclude=(undo.SAVE_PREFIX, undo.UNDO_PREFIX))
+        self.run_undo(entries, undo.select(entries, run=run) if run else [])
+
+    def run_undo(self, entries, selected):
+        if not selected:
+            messagebox.showinfo("Undo", "Nothing to undo.")
+            return
+        files = {e["path"] for e in selected}
+        if not messagebox.askyesno("Undo", f"Restore the previous ComicInfo.xml of {len(files)} file(s)?"):
+            return
+        restored, skipped = undo.undo(entries, selected)
+        for path in restored:
+            self.workspace.invalidate(path)
+        self.schedule_kavita_scan()
+        if self.cbz_path and os.path.abspath(self.cbz_path) in restored:
+            self.open_cbz_path(self.cbz_path)
+        message = f"Restored {len(restored)} file(s)."
+        if skipped:
+            message += "\n\nSkipped:\n" + "\n".join(skipped)
+        messagebox.showinfo("Undo", message)
 
     def resize_form_frame(self, event):
         # Expand the form frame to match canvas width
@@ -473,6 +779,14 @@ class ComicMetadataEditor(tb.Window):
         file_menu.add_command(label="Open CBZ", command=self.load_cbz)
         file_menu.add_command(label="Save CBZ", command=self.save_cbz)
         file_menu.add_command(label="Reload", command=self.reload_cbz)
+        file_menu.add_command(label="Next Chapter", command=lambda: self.open_adjacent_cbz(1))
+        file_menu.add_command(label="Previous Chapter", command=lambda: self.open_adjacent_cbz(-1))
+        file_menu.add_command(label="Page Strip", command=self.show_contact_sheet)
+        file_menu.add_separator()
+        self.stable_layout_var = tk.BooleanVar(value=DEFAULT_POLICY.stable_layout)
+        file_menu.add_checkbutton(label="Stable Archive Layout (rsync-friendly)", variable=self.stable_layout_var,
+                                  command=lambda: setattr(DEFAULT_POLICY, "stable_layout",
+                                                          self.stable_layout_var.get()))
         file_menu.add_separator()
         # file_menu.add_command(label="Reload Without Saving", command=self.reload_cbz)
         file_menu.add_command(label="Clear CBZ", command=self.clear_cbz_context)
@@ -480,6 +794,9 @@ class ComicMetadataEditor(tb.Window):
 
         # Edit menu
         edit_menu = tk.Menu(menu, tearoff=0)
+        edit_menu.add_command(label="Undo Last Change to This File", command=self.undo_current_file)
+        edit_menu.add_command(label="Undo Last Bulk Run", command=self.undo_last_run)
+        edit_menu.add_separator()
         edit_menu.add_command(label="Clear All Metadata Fields", command=self.clear_all_fields)
         edit_menu.add_command(label="Upload Cover", command=self.upload_cover)
 
@@ -540,7 +857,8 @@ class ComicMetadataEditor(tb.Window):
         md_frame.configure(labelanchor='nw')
         md_frame.pack(fill='both', expand=True, pady=(0, 5), ipadx=4, ipady=4)
 
-        self.setup_mangadex_ui_body(md_frame)
+        self.md_frame = md_frame
+        self.mangadex_panel_built = False
 
         # Add both frames to vertical pane
         vertical_paned.add(self.metadata_frame, weight=3)
@@ -563,6 +881,7 @@ class ComicMetadataEditor(tb.Window):
             self.canvas.yview_scroll(-1 * (event.delta), "units")
 
     def _on_cover_canvas_resize(self, event):
+        from PIL import Image, ImageTk
         if not self.cover_image_data:
             return
 
@@ -641,6 +960,8 @@ class ComicMetadataEditor(tb.Window):
         self.use_cover_btn = tb.Button(cover_button_row, text="Use This Cover", command=self.use_previewed_cover)
         self.use_cover_btn.pack(side="left")
 
+        tb.Button(cover_button_row, text="Show All", command=self.show_cover_grid).pack(side="left", padx=(5, 0))
+
         self.cover_preview_canvas = tk.Canvas(preview_frame, bg="gray")
         self.cover_preview_canvas.pack(fill="both", expand=True)
         self.cover_preview_canvas.bind("<Configure>", self._on_cover_canvas_resize)
@@ -648,6 +969,7 @@ class ComicMetadataEditor(tb.Window):
         self.use_cover_btn["state"] = "disabled"
         self.cover_volume_map = {}
         self.cover_image_data = None
+        self.cover_preview_filename = None
 
         # Tab 3: Chapter Info (scrollable)
         chapter_tab = tb.Frame(notebook)
@@ -693,6 +1015,9 @@ class ComicMetadataEditor(tb.Window):
         self.chapter_info_frame.bind("<Enter>",
                                      lambda e: self.chapter_canvas.bind_all("<MouseWheel>", self._on_mousewheel_ch))
         self.chapter_info_frame.bind("<Leave>", lambda e: self.chapter_canvas.unbind_all("<MouseWheel>"))
+        self.chapter_info_cache = {}
+        self.chapter_lang_frames = {}
+        self.chapter_visible_lang = None
 
         # Store tab references
         self.mangadex_tabs = {
@@ -717,6 +1042,7 @@ class ComicMetadataEditor(tb.Window):
             self.chapter_canvas.yview_scroll(-1 * int(event.delta), "units")
 
     def fetch_chapter_info(self):
+        import requests
         chapter_num = self.chapter_number_var.get().strip()
         if not chapter_num:
             messagebox.showwarning("Input", "Please enter a chapter number.")
@@ -724,6 +1050,8 @@ class ComicMetadataEditor(tb.Window):
 
         # Reset cache and UI
         self.chapter_info_cache = {}
+        self.chapter_lang_frames = {}
+        self.chapter_visible_lang = None
         self.chapter_lang_dropdown["values"] = []
 
         # Clear old frame AND canvas window
@@ -759,7 +1087,7 @@ class ComicMetadataEditor(tb.Window):
         )
 
         try:
-            res = requests.get("https://api.mangadex.org/chapter", params={
+            res = requests.get(f"{API_URL}/chapter", params={
                 "manga": self.mangadex_id,
                 "chapter": chapter_num,
                 "limit": 100
@@ -796,19 +1124,30 @@ class ComicMetadataEditor(tb.Window):
         if not chapter:
             return
 
-        for widget in self.chapter_info_frame.winfo_children():
-            widget.destroy()
+        # Rows are built once per language; switching just swaps the visible frame
+        lang_frame = self.chapter_lang_frames.get(lang)
+        if lang_frame is None:
+            lang_frame = self.build_chapter_info_rows(chapter)
+            self.chapter_lang_frames[lang] = lang_frame
 
-        for key, val in chapter.items():
-            row = tb.Frame(self.chapter_info_frame)
+        visible = self.chapter_lang_frames.get(self.chapter_visible_lang)
+        if visible is not None and visible is not lang_frame:
+            visible.pack_forget()
+        lang_frame.pack(fill="x", expand=True)
+        self.chapter_visible_lang = lang
 
-            row.pack(anchor="w", fill="x", expand=True, pady=4)
-            # Force layout update before resizing
-            self.chapter_info_frame.update_idletasks()
+        # Flush layout once per render, then match the canvas width
+        self.chapter_info_frame.update_idletasks()
+        canvas_width = self.chapter_canvas.winfo_width()
+        self.chapter_canvas.itemconfig(self.chapter_info_window, width=canvas_width)
+        self.chapter_canvas.yview_moveto(0)
+
+    def build_chapter_info_rows(self, chapter):
+        lang_frame = tb.Frame(self.chapter_info_frame)
 
-            # Get current canvas width and apply it
-            canvas_width = self.chapter_canvas.winfo_width()
-            self.chapter_canvas.itemconfig(self.chapter_info_window, width=canvas_width)
+        for key, val in chapter.items():
+            row = tb.Frame(lang_frame)
+            row.pack(anchor="w", fill="x", expand=True, pady=4)
 
             label_text = key.replace("_", " ").capitalize()
             tb.Label(row, text=f"{label_text}:", width=14, anchor="nw", font=self.base_font) \
@@ -818,7 +1157,9 @@ class ComicMetadataEditor(tb.Window):
             tb.Button(row, text="+", width=2, command=lambda k=label_text, v=val: self.add_field(k, v),
                       bootstyle="success-outline").pack(side="right", anchor="n", padx=4)
 
-            tb.Separator(self.chapter_info_frame, orient="horizontal").pack(fill="x", padx=4, pady=2)
+            tb.Separator(lang_frame, orient="horizontal").pack(fill="x", padx=4, pady=2)
+
+        return lang_frame
 
     def setup_cover_ui(self):
         self.cover_canvas = tk.Canvas(self.right_frame, width=280, height=380, bg="gray")
@@ -834,6 +1175,12 @@ class ComicMetadataEditor(tb.Window):
         self.toolbar.pack(pady=20, fill="x")
 
         tb.Button(self.toolbar, text="Open CBZ", command=self.load_cbz, bootstyle="primary").pack(side="left", padx=5)
+        tb.Button(self.toolbar, text="◀ Prev", command=lambda: self.open_adjacent_cbz(-1),
+                  bootstyle="secondary-outline").pack(side="left", padx=5)
+        tb.Button(self.toolbar, text="Next ▶", command=lambda: self.open_adjacent_cbz(1),
+                  bootstyle="secondary-outline").pack(side="left", padx=5)
+        self.save_status_var = tk.StringVar()
+        tb.Label(self.toolbar, textvariable=self.save_status_var, bootstyle="secondary").pack(side="right", padx=5)
         # self.clear_btn = tb.Button(self.toolbar, text="Clear Fields", command=self.clear_all_fields, bootstyle="warning")
         # self.save_btn = tb.Button(self.toolbar, text="Save CBZ", command=self.save_cbz, bootstyle="success")
         # self.clear_btn.pack_forget()
@@ -845,6 +1192,9 @@ class ComicMetadataEditor(tb.Window):
         file_frame = tb.LabelFrame(self.right_frame, text="Files in CBZ", bootstyle="secondary", padding=10)
         file_frame.pack(fill="both", expand=True, pady=5)
 
+        tb.Button(file_frame, text="Page Strip", bootstyle="secondary-outline",
+                  command=self.show_contact_sheet).pack(anchor="e", pady=(0, 5))
+
         container = tb.Frame(file_frame)
         container.pack(fill="both", expand=True)
 
@@ -865,14 +1215,15 @@ class ComicMetadataEditor(tb.Window):
         self.cbz_file_preview_text.place_forget()  # hide by default
 
     def preview_selected_cbz_file(self, event):
-        if not self.cbz_bytes:
+        from PIL import Image, ImageTk, UnidentifiedImageError
+        if not self.cbz_path:
             return
         selected = self.cbz_file_listbox.curselection()
         if not selected:
             return
         filename = self.cbz_file_listbox.get(selected[0])
         try:
-            with ZipFile(io.BytesIO(self.cbz_bytes), 'r') as zipf:
+            with ZipFile(self.cbz_path, 'r') as zipf:
                 data = zipf.read(filename)
 
             # Try to open as image
@@ -913,9 +1264,27 @@ class ComicMetadataEditor(tb.Window):
         path = filedialog.askopenfilename(filetypes=[("Comic Book Zip", "*.cbz")])
         if not path:
             return
+        self.open_cbz_path(path)
+
+    def open_adjacent_cbz(self, step):
+        if not self.cbz_path:
+            return
+        path = self.workspace.neighbour(self.cbz_path, step)
+        if path is None:
+            self.bell()
+            return
+        self.open_cbz_path(path)
+
+    def open_cbz_path(self, path):
+        from PIL import ImageTk
+
+        if self.save_queue.busy(path):
+            # Open it once the queued save has landed, not the version before it
+            self.after(100, lambda: self.open_cbz_path(path))
+            return
+        self.ensure_mangadex_panel()
         self.cbz_path = path
         # Attempt to extract chapter number from filename
-        import re
         filename = os.path.basename(path)
         pattern = re.compile(r"[Cc](?:h(?:apter)?)?[ ._]*([0-9]{1,4}(?:\.[0-9]+)?)")
         match = pattern.search(filename)
@@ -930,69 +1299,54 @@ class ComicMetadataEditor(tb.Window):
         self.fetch_md_btn.config(state="normal")
         self.fetch_cover_btn.config(state="normal")
 
-        filename = os.path.basename(path)
         self.metadata_frame.config(text=f"Metadata Fields – {filename}")
         self.clear_all_fields()
         self.cover_canvas.delete("all")
         self.cover_image = None
         self.cover_data = None
         self.cover_name = None
-        # self.upload_btn.pack(pady=5)
-        # self.clear_cover_btn.pack(pady=5)
-        # self.clear_btn.pack(side="left", padx=5)
-        # self.save_btn.pack(side="left", padx=5)
         self.cbz_file_listbox.delete(0, "end")
 
-        with open(path, 'rb') as f:
-            self.cbz_bytes = f.read()
-
         try:
-            with ZipFile(io.BytesIO(self.cbz_bytes), 'r') as zipf:
-                for name in zipf.namelist():
-                    self.cbz_file_listbox.insert("end", name)
-                if 'ComicInfo.xml' in zipf.namelist():
-                    xml_data = zipf.read('ComicInfo.xml')
-                    self.comicinfo_data = etree.fromstring(xml_data)
-                else:
-                    self.comicinfo_data = etree.Element("ComicInfo")
-                    messagebox.showinfo("Info", "No ComicInfo.xml found. Starting with empty metadata.")
-                series_value = ""
-                for child in self.comicinfo_data:
-                    tag = child.tag
-                    text = child.text or ""
-                    if tag.lower() == "series":
-                        series_value = text
-                    self.add_field(tag, text)
-
-                # Pre-fill the MangaDex title field
-                if series_value:
-                    self.manga_title_var.set(series_value)
-
-                self.show_cover(zipf)
+            check_archive(path)
+            handle = self.workspace.get(path)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to read CBZ file:\n{e}")
+            return
 
-    def show_cover(self, zipf):
-        possible_names = ['folder.jpg', 'cover.jpg', '000.jpg', '0001.jpg']
-        for name in zipf.namelist():
-            if os.path.basename(name).lower() in possible_names:
-                try:
-                    self.cover_data = zipf.read(name)
-                    self.cover_name = name
-                    image = Image.open(io.BytesIO(self.cover_data))
-                    image.thumbnail((280, 380))
-                    self.cover_image = ImageTk.PhotoImage(image)
-                    self.cover_canvas.create_image(140, 190, image=self.cover_image)
-                    return
-                except Exception:
-                    pass
-        self.cover_canvas.create_rectangle(10, 10, 270, 370, fill='lightgray')
-        self.cover_canvas.create_text(140, 190, text="No Cover", font=("Arial", 16))
+        self.cbz_file_listbox.insert("end", *handle.names)
+        self.comicinfo_data = handle.comicinfo
+        if 'ComicInfo.xml' not in handle.names:
+            messagebox.showinfo("Info", "No ComicInfo.xml found. Starting with empty metadata.")
+        series_value = ""
+        for tag, text in self.comicinfo_data.as_dict().items():
+            if tag.lower() == "series":
+                series_value = text
+            self.add_field(tag, text)
+
+        # Pre-fill the MangaDex title field
+        if series_value:
+            self.manga_title_var.set(series_value)
+
+        # Cover comes pre-decoded from the workspace
+        if handle.thumbnail is not None:
+            self.cover_data = handle.cover_data
+            self.cover_name = handle.cover_name
+            self.cover_image = ImageTk.PhotoImage(handle.thumbnail)
+            self.cover_canvas.create_image(140, 190, image=self.cover_image)
+        else:
+            self.cover_canvas.create_rectangle(10, 10, 270, 370, fill='lightgray')
+            self.cover_canvas.create_text(140, 190, text="No Cover", font=("Arial", 16))
+
+        # Warm up the next chapter while this one is being edited
+        self.workspace.prefetch(self.workspace.neighbour(path, 1))
 
     def upload_cover(self):
+        from PIL import Image, ImageTk
         path = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg *.jpeg *.png")])
         if not path:
             return
+        self.ensure_mangadex_panel()
         with open(path, "rb") as f:
             self.cover_data = f.read()
             self.cover_name = "folder.jpg"
@@ -1062,6 +1416,10 @@ class ComicMetadataEditor(tb.Window):
         self.fields = []
 
     def save_cbz(self):
+        if self.cbz_path and os.path.abspath(self.cbz_path) in self.bulk_active:
+            # The bulk run would repack the version from before this save
+            messagebox.showwarning("Busy", "A bulk run is writing this file. Save again once it has finished.")
+            return
         # Gather keys and check for duplicates
         keys = []
         for f in self.fields:
@@ -1078,7 +1436,12 @@ class ComicMetadataEditor(tb.Window):
             return  # cancel save
 
         # Proceed with XML creation
-        root = etree.Element("ComicInfo")
+        # Fields are the source of truth; <Pages> and root attributes carry over from the loaded file
+        comicinfo = ComicInfo()
+        if self.comicinfo_data is not None:
+            comicinfo.attrib = dict(self.comicinfo_data.attrib)
+            if self.comicinfo_data.pages is not None:
+                comicinfo.pages = self.comicinfo_data.pages
         for f in self.fields:
             if f is None:
                 continue
@@ -1086,37 +1449,75 @@ class ComicMetadataEditor(tb.Window):
             val = str(f[1].get().strip())
             if key:
                 resolved = self.resolve_template(val, self.get_current_metadata_dict(), self.cbz_path)
-                etree.SubElement(root, key).text = resolved
+                comicinfo.set(key, resolved)
 
-        xml_data = etree.tostring(root, pretty_print=True, encoding="utf-8", xml_declaration=True)
-        temp_cbz = self.cbz_path + ".tmp"
         try:
-            with ZipFile(io.BytesIO(self.cbz_bytes), 'r') as zin, ZipFile(temp_cbz, 'w') as zout:
-                for item in zin.infolist():
-                    if item.filename != 'ComicInfo.xml' and item.filename != self.cover_name:
-                        zout.writestr(item, zin.read(item))
-                zout.writestr("ComicInfo.xml", xml_data)
-                if self.cover_data:
-                    zout.writestr(self.cover_name or "folder.jpg", self.cover_data)
-            os.replace(temp_cbz, self.cbz_path)
-            messagebox.showinfo("Saved", "CBZ updated successfully.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save CBZ:\n{e}")
+            for fix in validate.check(comicinfo, os.path.basename(self.cbz_path)):
+                print(f"Corrected {fix}")
+        except validate.ValidationError as e:
+            messagebox.showerror("Invalid Metadata", "Not saved.\n\n" + validate.report({e.label: e.errors}))
+            return
+
+        # The archive is repacked on the writer thread from this snapshot
+        job = SaveJob(self.cbz_path, comicinfo.to_bytes(), self.cover_name, self.cover_data,
+                      undo.run_id(undo.SAVE_PREFIX))
+        if not self.save_queue.save(job):
+            # A coalesced save reports through the job it replaced
+            self.saves_outstanding += 1
+            if self.saves_outstanding == 1:
+                self.after(50, self.poll_saves)
+        self.set_save_status(f"Saving {os.path.basename(self.cbz_path)}...")
+
+    def poll_saves(self):
+        while True:
+            try:
+                path, error = self.save_results.get_nowait()
+            except queue.Empty:
+                break
+            self.saves_outstanding -= 1
+            self.finish_save(path, error)
+        if self.saves_outstanding:
+            self.after(50, self.poll_saves)
+
+    def finish_save(self, path, error):
+        name = os.path.basename(path)
+        if error is not None:
+            self.set_save_status(f"Save failed: {name}")
+            messagebox.showerror("Error", f"Failed to save {name}:\n{error}")
+            return
+        self.schedule_kavita_scan()
+        if self.saves_outstanding:
+            self.set_save_status(f"Saved {name}, more saves queued...")
+        else:
+            self.set_save_status(f"Saved {name}", clear_after_ms=4000)
 
     def fetch_mangadex_metadata(self):
+        import requests
         title = self.manga_title_var.get().strip()
         if not title:
             messagebox.showwarning("Input", "Please enter a manga title.")
             return
         try:
-            res = requests.get("https://api.mangadex.org/manga", params={"title": title, "limit": 1})
-            res.raise_for_status()
-            data = res.json()
+            series_folder = os.path.dirname(self.cbz_path) if self.cbz_path else None
+            pinned = read_sidecar(series_folder) if series_folder else None
+            if pinned and pinned.get("title", "").lower() == title.lower():
+                # Series already resolved under this title, skip the search
+                res = requests.get(f"{API_URL}/manga/{pinned['mangaId']}")
+                res.raise_for_status()
+                results = [res.json()["data"]]
+            else:
+                res = requests.get(f"{API_URL}/manga", params={"title": title, "limit": 20})
+                res.raise_for_status()
+                results = res.json()["data"]
             self.clear_md_result()
-            if not data["data"]:
+            if not results:
                 tb.Label(self.md_result_frame, text="No manga found.", bootstyle="warning").pack()
                 return
-            manga = data["data"][0]
+            # Prefer an exact title, then an alternative title; anything else is only a guess
+            rank = {"title": 0, "altTitle": 1, "fallback": 2}
+            manga = min(results, key=lambda m: rank[match_confidence(m, title)])
+            if series_folder and manga["id"] != (pinned or {}).get("mangaId"):
+                self.pin_series(series_folder, manga, title, pinned)
             attr = manga["attributes"]
             tags = attr.get("tags", [])
             info = {
@@ -1141,19 +1542,24 @@ class ComicMetadataEditor(tb.Window):
         except Exception as e:
             messagebox.showerror("Error", f"Failed to fetch manga info:\n{e}")
 
+    def pin_series(self, series_folder, manga, title, pinned):
+        confidence = match_confidence(manga, title)
+        if confidence == "fallback":
+            return  # shown for this session only; a guess is never pinned
+        if pinned and not messagebox.askyesno(
+                "Re-pin Series",
+                f"{os.path.basename(series_folder)} is pinned to {pinned.get('title')!r} ({pinned['mangaId']}).\n"
+                f"Pin it to the match for {title!r} ({manga['id']}) instead?"):
+            return
+        write_sidecar(series_folder, manga["id"], title, confidence)
+
     def fetch_mangadex_cover(self):
         if not self.mangadex_id:
             messagebox.showwarning("Warning", "Fetch metadata first.")
             return
 
         try:
-            res = requests.get("https://api.mangadex.org/cover", params={
-                "manga[]": self.mangadex_id,
-                "limit": 100,
-                "order[volume]": "asc"
-            })
-            res.raise_for_status()
-            data = res.json()["data"]
+            data = list_covers([self.mangadex_id], **{"order[volume]": "asc"})[self.mangadex_id]
 
             self.cover_volume_map.clear()
             self.cover_volume_listbox.delete(0, "end")
@@ -1193,7 +1599,14 @@ class ComicMetadataEditor(tb.Window):
         for widget in self.md_result_frame.winfo_children():
             widget.destroy()
 
+    def mangadex_cover_url(self, filename, size=None):
+        # MangaDex serves .256.jpg / .512.jpg thumbnails next to each original
+        url = f"{UPLOADS_URL}/covers/{self.mangadex_id}/{filename}"
+        return f"{url}.{size}.jpg" if size else url
+
     def preview_selected_volume_cover(self, event):
+        import requests
+        from PIL import Image, ImageTk
         if not self.mangadex_id:
             return
         selected = self.cover_volume_listbox.curselection()
@@ -1206,13 +1619,6 @@ class ComicMetadataEditor(tb.Window):
             return
 
         try:
-            url = f"https://uploads.mangadex.org/covers/{self.mangadex_id}/{filename}"
-            res = requests.get(url)
-            res.raise_for_status()
-
-            self.cover_image_data = res.content
-            image = Image.open(io.BytesIO(self.cover_image_data))
-
             # Wait for canvas size update
             self.cover_preview_canvas.update_idletasks()
             canvas_width = self.cover_preview_canvas.winfo_width()
@@ -1226,6 +1632,15 @@ class ComicMetadataEditor(tb.Window):
             max_width = canvas_width - 20
             max_height = canvas_height - 20
 
+            # Covers are roughly 1:1.42, so the 256 variant is enough for small canvases
+            size = 256 if max_width <= 256 and max_height <= 364 else 512
+            res = requests.get(self.mangadex_cover_url(filename, size))
+            res.raise_for_status()
+
+            self.cover_image_data = res.content
+            self.cover_preview_filename = filename
+            image = Image.open(io.BytesIO(self.cover_image_data))
+
             image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
 
             self.preview_image = ImageTk.PhotoImage(image)
@@ -1240,12 +1655,170 @@ class ComicMetadataEditor(tb.Window):
         except Exception as e:
             messagebox.showerror("Error", f"Failed to preview cover:\n{e}")
 
+    def show_cover_grid(self):
+        import queue
+        from concurrent.futures import ThreadPoolExecutor
+        import requests
+        from PIL import Image, ImageTk
+        if not self.cover_volume_map:
+            messagebox.showwarning("Warning", "Fetch covers first.")
+            return
+
+        window = tb.Toplevel(self)
+        window.title("MangaDex Covers")
+        window.geometry("900x700")
+
+        canvas = tk.Canvas(window, highlightthickness=0)
+        scrollbar = tb.Scrollbar(window, orient="vertical", command=canvas.yview)
+        canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        canvas.pack(side="left", fill="both", expand=True)
+        grid_frame = tb.Frame(canvas)
+        canvas.create_window((0, 0), window=grid_frame, anchor="nw")
+        grid_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+
+        columns = 5
+        tiles = []
+        for index, label in enumerate(self.cover_volume_map):
+            tile = tb.Label(grid_frame, text="Loading...", width=20, anchor="center", compound="top",
+                            font=self.base_font)
+            tile.grid(row=index // columns, column=index % columns, padx=6, pady=6)
+            tile.bind("<Button-1>", lambda e, i=index: self.select_cover_from_grid(i, window))
+            tiles.append(tile)
+
+        # Thumbnails download in worker threads; Tk widgets are only touched from the poll loop
+        results = queue.Queue()
+
+        def fetch_thumbnail(index, url):
+            try:
+                res = requests.get(url)
+                res.raise_for_status()
+                results.put((index, res.content))
+            except Exception:
+                results.put((index, None))
+
+        pool = ThreadPoolExecutor(max_workers=8)
+        for index, filename in enumerate(self.cover_volume_map.values()):
+            pool.submit(fetch_thumbnail, index, self.mangadex_cover_url(filename, 256))
+        pool.shutdown(wait=False)
+
+        window.grid_images = {}
+        labels = list(self.cover_volume_map)
+        remaining = [len(tiles)]
+
+        def poll():
+            if not window.winfo_exists():
+                return
+            while not results.empty():
+                index, data = results.get()
+                remaining[0] -= 1
+                if data is None:
+                    tiles[index].config(text=f"{labels[index]}\n(failed)")
+                    continue
+                image = Image.open(io.BytesIO(data))
+                image.thumbnail((160, 230))
+                window.grid_images[index] = ImageTk.PhotoImage(image)
+                tiles[index].config(image=window.grid_images[index], text=labels[index])
+            if remaining[0] > 0:
+                window.after(50, poll)
+
+        poll()
+
+    def show_contact_sheet(self):
+        import queue
+        from PIL import Image, ImageTk
+        if not self.cbz_path:
+            messagebox.showinfo("Info", "No CBZ file loaded.")
+            return
+        path = self.cbz_path
+        try:
+            names = self.contact_sheets.pages(path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read CBZ file:\n{e}")
+            return
+
+        window = tb.Toplevel(self)
+        window.title(f"Pages – {os.path.basename(path)}")
+        window.geometry("1000x750")
+
+        canvas = tk.Canvas(window, highlightthickness=0)
+        scrollbar = tb.Scrollbar(window, orient="vertical", command=canvas.yview)
+        canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        canvas.pack(side="left", fill="both", expand=True)
+        grid_frame = tb.Frame(canvas)
+        canvas.create_window((0, 0), window=grid_frame, anchor="nw")
+        grid_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+
+        columns = 7
+        tiles = {}
+        for index, name in enumerate(names):
+            tile = tb.Label(grid_frame, text=f"{index + 1}\n{os.path.basename(name)}", width=14, anchor="center",
+                            compound="top", font=("Segoe UI", 9))
+            tile.grid(row=index // columns, column=index % columns, padx=4, pady=4)
+            tile.bind("<Button-1>", lambda e, n=name: self.select_cbz_member(n))
+            tiles[name] = tile
+
+        # Pages render in pool threads; Tk widgets are only touched from the poll loop
+        results = queue.Queue()
+        cached = self.contact_sheets.cached(path)
+        if cached is not None:
+            results.put(cached)
+        else:
+            self.contact_sheets.render(path, names, results.put)
+
+        window.sheet_images = {}
+        remaining = [len(names)]
+
+        def poll():
+            if not window.winfo_exists():
+                return
+            while not results.empty():
+                for name, size, rgb in results.get():
+                    remaining[0] -= 1
+                    if size is None:
+                        tiles[name].config(text=f"{os.path.basename(name)}\n(unreadable)")
+                        continue
+                    window.sheet_images[name] = ImageTk.PhotoImage(Image.frombytes("RGB", size, rgb))
+                    tiles[name].config(image=window.sheet_images[name])
+            if remaining[0] > 0:
+                window.after(30, poll)
+
+        poll()
+
+    def select_cbz_member(self, name):
+        names = self.cbz_file_listbox.get(0, "end")
+        if name not in names:
+            return
+        index = names.index(name)
+        self.cbz_file_listbox.selection_clear(0, "end")
+        self.cbz_file_listbox.selection_set(index)
+        self.cbz_file_listbox.see(index)
+        self.preview_selected_cbz_file(None)
+
+    def select_cover_from_grid(self, index, window):
+        self.cover_volume_listbox.selection_clear(0, "end")
+        self.cover_volume_listbox.selection_set(index)
+        self.cover_volume_listbox.see(index)
+        window.destroy()
+        self.preview_selected_volume_cover(None)
+
     def use_previewed_cover(self):
-        if not self.cover_image_data:
+        import requests
+        from PIL import Image, ImageTk
+        if not self.cover_preview_filename:
+            return
+
+        # The preview is a thumbnail; fetch the full original only now
+        try:
+            res = requests.get(self.mangadex_cover_url(self.cover_preview_filename))
+            res.raise_for_status()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to download cover:\n{e}")
             return
 
         # Save as current CBZ cover
-        self.cover_data = self.cover_image_data
+        self.cover_data = res.content
         self.cover_name = "folder.jpg"
 
         # Display it in the right panel
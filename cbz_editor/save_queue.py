@@ -0,0 +1,98 @@
+"""
+Background writer for the single-file editor.
+
+The editor builds a SaveJob on the Tk thread (the ComicInfo bytes and cover
+as they were when Save was pressed) and hands it to SaveQueue, which repacks
+archives one at a time on a writer thread. A save for an archive that is
+still waiting its turn replaces the waiting one, so saving repeatedly only
+writes the latest state. The archive is read from disk when its turn comes,
+so a save queued behind another builds on that one's result.
+"""
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+
+from compression import DEFAULT_POLICY
+import kavita
+import undo
+
+
+class SaveJob:
+    __slots__ = ("path", "xml_data", "cover_name", "cover_data", "run")
+
+    def __init__(self, path, xml_data, cover_name=None, cover_data=None, run=None):
+        self.path = path
+        self.xml_data = xml_data
+        self.cover_name = cover_name  # existing cover member, replaced (or dropped without cover_data)
+        self.cover_data = cover_data
+        self.run = run
+
+
+def write_job(job):
+    temp_cbz = job.path + ".tmp"
+    try:
+        with zipfile.ZipFile(job.path, 'r') as zin, zipfile.ZipFile(temp_cbz, 'w') as zout:
+            previous = undo.snapshot(zin)
+            members = [(item.filename, zin.read(item), item) for item in zin.infolist()
+                       if item.filename != 'ComicInfo.xml' and item.filename != job.cover_name]
+            members.append(("ComicInfo.xml", job.xml_data, zin.NameToInfo.get("ComicInfo.xml")))
+            if job.cover_data:
+                members.append((job.cover_name or "folder.jpg", job.cover_data, None))
+            DEFAULT_POLICY.write_members(zout, members)
+        os.replace(temp_cbz, job.path)
+    except Exception:
+        if os.path.exists(temp_cbz):
+            os.remove(temp_cbz)
+        raise
+    kavita.record_change(job.path)
+    undo.record(job.path, previous, job.run)
+
+
+class SaveQueue:
+    def __init__(self, deliver):
+        self.deliver = deliver  # deliver(path, error) is called on the writer thread; it must not touch Tk
+        self.pending = OrderedDict()  # abspath -> latest SaveJob not yet started
+        self.active = None  # abspath being written
+        self.cond = threading.Condition()
+        self.thread = None
+
+    def save(self, job) -> bool:
+        """Queue job; returns True if it replaced a save still waiting for the same archive."""
+        key = os.path.abspath(job.path)
+        with self.cond:
+            coalesced = key in self.pending
+            self.pending[key] = job  # a replaced job keeps its place in the queue
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            self.cond.notify_all()
+        return coalesced
+
+    def busy(self, path=None) -> bool:
+        with self.cond:
+            if path is None:
+                return bool(self.pending) or self.active is not None
+            key = os.path.abspath(path)
+            return key in self.pending or self.active == key
+
+    def wait(self, path=None) -> None:
+        with self.cond:
+            while self.busy(path):
+                self.cond.wait()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending:
+                    self.cond.wait()
+                self.active, job = self.pending.popitem(last=False)
+            error = None
+            try:
+                write_job(job)
+            except Exception as e:
+                error = e
+            with self.cond:
+                self.active = None
+                self.cond.notify_all()
+            self.deliver(job.path, error)
@@ -0,0 +1,61 @@
+"""
+Startup guard for the editor.
+
+Imports main.py in a fresh interpreter, checks that the heavy modules are
+still loaded lazily, and times cold start to an interactive window.
+Exits non-zero when the budget is exceeded:
+
+    python startup_bench.py --budget 1.0
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# PIL is not listed: ttkbootstrap imports it itself
+LAZY_MODULES = ("requests", "lxml")
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+app = main.ComicMetadataEditor()
+app.update()
+shown = time.perf_counter()
+lazy = [m for m in {lazy!r} if m in sys.modules]
+app.destroy()
+print(json.dumps({{"import": imported - started, "startup": shown - started, "eager": lazy}}))
+"""
+
+
+def measure() -> dict:
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, "-c", PROBE.format(lazy=LAZY_MODULES)],
+                            cwd=here, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure editor import and cold-start time.")
+    parser.add_argument("--budget", type=float, default=1.0, help="max seconds from import to interactive window")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    best = min(runs, key=lambda r: r["startup"])
+    print(f"import {best['import'] * 1000:.0f} ms, window {best['startup'] * 1000:.0f} ms (best of {args.runs})")
+
+    failed = False
+    if best["eager"]:
+        print(f"Imported at startup but should be lazy: {', '.join(best['eager'])}")
+        failed = True
+    if best["startup"] > args.budget:
+        print(f"Startup exceeds budget of {args.budget:.2f}s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
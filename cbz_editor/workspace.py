@@ -0,0 +1,136 @@
+"""
+LRU workspace of recently opened archives for the single-file editor.
+
+Each entry is a cheap handle: the member list, the parsed ComicInfo and the
+cover bytes plus a decoded thumbnail, keyed by path and validated against
+the file's size and mtime. Page data is never kept. The next chapter in the
+folder can be prefetched on a background thread.
+"""
+import io
+import os
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from comicinfo import ComicInfo
+
+COVER_NAMES = ['folder.jpg', 'cover.jpg', '000.jpg', '0001.jpg']
+ARCHIVE_EXTENSIONS = (".cbz", ".zip")
+
+
+def natural_key(name):
+    # "ch2" sorts before "ch10"
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", name)]
+
+
+def file_signature(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class ArchiveHandle:
+    __slots__ = ("path", "signature", "names", "comicinfo", "cover_name", "cover_data", "thumbnail")
+
+    def __init__(self, path, thumbnail_size=(280, 380)):
+        from PIL import Image
+
+        self.path = path
+        self.signature = file_signature(path)
+        self.cover_name = None
+        self.cover_data = None
+        self.thumbnail = None
+        with zipfile.ZipFile(path, 'r') as zipf:
+            self.names = zipf.namelist()
+            self.comicinfo = ComicInfo.from_zip(zipf)
+            self.comicinfo.tags()  # parse fully while the file is open
+            for name in self.names:
+                if os.path.basename(name).lower() in COVER_NAMES:
+                    try:
+                        data = zipf.read(name)
+                        image = Image.open(io.BytesIO(data))
+                        image.draft("RGB", thumbnail_size)
+                        image.thumbnail(thumbnail_size)
+                    except Exception:
+                        continue
+                    self.cover_name, self.cover_data, self.thumbnail = name, data, image
+                    break
+
+    def size(self):
+        thumb = self.thumbnail.width * self.thumbnail.height * 4 if self.thumbnail else 0
+        return len(self.cover_data or b"") + thumb + 64 * len(self.names)
+
+
+class Workspace:
+    def __init__(self, max_entries=16, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.handles = OrderedDict()  # path -> ArchiveHandle, most recent last
+        self.lock = threading.Lock()
+        self.pending = {}  # path -> Future of an in-flight prefetch
+        self.pool = ThreadPoolExecutor(max_workers=1)
+
+    def get(self, path):
+        path = os.path.abspath(path)
+        future = self.pending.get(path)
+        if future is not None:
+            future.result()  # wait for the prefetch instead of loading twice
+        with self.lock:
+            handle = self.handles.get(path)
+            if handle is not None and handle.signature == file_signature(path):
+                self.handles.move_to_end(path)
+                return handle
+        return self._load(path)
+
+    def _load(self, path):
+        handle = ArchiveHandle(path)
+        with self.lock:
+            self.handles[path] = handle
+            self.handles.move_to_end(path)
+            self._evict()
+        return handle
+
+    def _evict(self):
+        total = sum(h.size() for h in self.handles.values())
+        while len(self.handles) > 1 and (len(self.handles) > self.max_entries or total > self.max_bytes):
+            _, oldest = self.handles.popitem(last=False)
+            total -= oldest.size()
+
+    def invalidate(self, path):
+        with self.lock:
+            self.handles.pop(os.path.abspath(path), None)
+
+    def prefetch(self, path):
+        if path is None:
+            return
+        path = os.path.abspath(path)
+        with self.lock:
+            in_flight = self.pending.get(path)
+            if path in self.handles or (in_flight is not None and not in_flight.done()):
+                return
+
+        def load():
+            try:
+                self._load(path)
+            except Exception:
+                pass  # a bad neighbour only matters if it is actually opened
+            finally:
+                self.pending.pop(path, None)
+
+        self.pending[path] = self.pool.submit(load)
+
+    @staticmethod
+    def siblings(path):
+        folder = os.path.dirname(os.path.abspath(path))
+        names = [entry.name for entry in os.scandir(folder)
+                 if entry.is_file() and entry.name.lower().endswith(ARCHIVE_EXTENSIONS)]
+        return [os.path.join(folder, name) for name in sorted(names, key=lambda name: natural_key(os.path.splitext(name)[0]))]
+
+    def neighbour(self, path, step):
+        siblings = self.siblings(path)
+        try:
+            index = siblings.index(os.path.abspath(path)) + step
+        except ValueError:
+            return None
+        return siblings[index] if 0 <= index < len(siblings) else None